@@ -0,0 +1,491 @@
+import york_graphics as yg
+
+"""
+The board renderers. A renderer draws the board for the game, and is given the cells which have
+changed since the last frame so it does not have to look at the whole board every time.
+
+Every renderer has the following methods:
+    - Reset(game):       get ready to draw a new board. Called when a new game starts or the camera
+                         scrolls, before any cells are drawn. Anything already drawn must be removed.
+    - Draw(game, cells): draw the given list of (row, column) cells, which have changed since
+                         they were last drawn. Cells are board positions, use game.CellPosition()
+                         to find where they are on the screen. Only cells on the screen are given.
+
+A renderer can also have the following method, to draw frames in between two moves of the snake:
+    - Animate(game, fraction): draw the snake the given fraction of the way from where it was
+                               before the last move to where it is now. Draw() is always drawn as
+                               fraction 0, the move after it as fraction 1.
+
+and the following one, so the camera can scroll by a tile without everything being drawn again:
+    - Scroll(game, dx, dy, cells): the camera has moved by a tile and everything in the board group
+                                   has been moved by (dx, dy) pixels to match. cells are the tiles
+                                   which have gone off the screen, whose shapes should be removed.
+                                   Draw() is then given the tiles which have come onto it.
+"""
+
+class TileRenderer(object):
+    """
+    Draws each snake and food tile as its own shape on the canvas. Empty tiles are not drawn,
+    the canvas background shows through instead.
+    """
+    def Reset(self, game):
+        yg.clearGroup(game.BOARD_GROUP)
+
+    def Scroll(self, game, dx, dy, cells):
+        RemoveTiles(cells)
+
+    def Draw(self, game, cells):
+        for row, col in cells:
+            tile = game.board[row][col]
+            if tile == game.TILE_ID_EMPTY:
+                yg.removeShape((row, col))
+            else:
+                x, y = game.CellPosition(row, col)
+                game.DrawTile(x, y, game.TILE_SIZE, game.TILE_COLOURS[tile], (row, col))
+
+
+
+class RectRenderer(object):
+    """
+    Merges the tiles on the screen into as few rectangles as possible. Runs of the same tile
+    along a row are joined into one, then runs which line up exactly with a run on the row below
+    are joined into a taller rectangle. Each rectangle is a retained shape keyed by its position,
+    size and tile, so only the rectangles which changed are touched on the canvas.
+
+    The runs of each row are kept between frames and only the rows with changed cells are looked
+    at again. When nothing changed the rectangles already on the canvas are left alone.
+    """
+    def Reset(self, game):
+        yg.clearGroup(game.BOARD_GROUP)
+        self.rowRuns = {}  # board row -> list of (column, length, tile) runs of tiles which are not empty
+        self.rects = set()  # (row, column, height, width, tile) of the rectangles on the canvas
+
+    def Scroll(self, game, dx, dy, cells):
+        # The rectangles are keyed by board position, so they are right where they have been moved
+        # to. Only the rows on the screen are kept, and scrolling sideways clips every row differently.
+        for row in list(self.rowRuns):
+            if not game.cameraRow <= row < game.cameraRow + game.TILES_VERTICAL:
+                del self.rowRuns[row]
+        if dx != 0:
+            for row in self.rowRuns:
+                self.rowRuns[row] = self.FindRuns(game, row)
+        self.DrawRects(game)
+
+    def Draw(self, game, cells):
+        if len(cells) == 0:
+            return
+
+        for row in set(cell[0] for cell in cells):
+            self.rowRuns[row] = self.FindRuns(game, row)
+        self.DrawRects(game)
+
+    def DrawRects(self, game):
+        """
+        Merge the runs into rectangles and change the ones on the canvas to match.
+        """
+        rects = self.MergeRuns()
+        for rect in self.rects - rects:
+            yg.removeShape(rect)
+        for rect in rects - self.rects:
+            self.DrawRect(game, rect)
+        self.rects = rects
+
+    def FindRuns(self, game, row):
+        """
+        Return the runs of the same tile along the part of a row which is on the screen.
+        """
+        runs = []
+        firstCol = game.cameraCol
+        lastCol = min(game.cameraCol + game.TILES_HORIZONTAL, game.boardWidth)
+        col = firstCol
+        while col < lastCol:
+            tile = game.board[row][col]
+            start = col
+            while col < lastCol and game.board[row][col] == tile:
+                col += 1
+            if tile != game.TILE_ID_EMPTY:
+                runs.append((start, col - start, tile))
+        return runs
+
+    def MergeRuns(self):
+        """
+        Return the set of rectangles made by stacking runs which line up on consecutive rows.
+        """
+        rects = set()
+        growing = {}  # run -> (top row, height) of the rectangle which ended with it on the last row
+        lastRow = None
+        for row in sorted(self.rowRuns):
+            if lastRow == None or row != lastRow + 1:
+                for run, (top, height) in growing.items():
+                    rects.add((top, run[0], height, run[1], run[2]))
+                growing = {}
+
+            nextGrowing = {}
+            for run in self.rowRuns[row]:
+                if run in growing:
+                    top, height = growing.pop(run)
+                    nextGrowing[run] = (top, height + 1)
+                else:
+                    nextGrowing[run] = (row, 1)
+
+            # Rectangles which did not carry on to this row are finished
+            for run, (top, height) in growing.items():
+                rects.add((top, run[0], height, run[1], run[2]))
+            growing = nextGrowing
+            lastRow = row
+
+        for run, (top, height) in growing.items():
+            rects.add((top, run[0], height, run[1], run[2]))
+        return rects
+
+    def DrawRect(self, game, rect):
+        row, col, height, width, tile = rect
+        x, y = game.CellPosition(row, col)
+        height = height * game.TILE_SIZE
+        yg.moveTo(x, y + height / 2)
+        yg.setLineColour(game.TILE_COLOURS[tile])
+        yg.setLineThickness(height)
+        yg.drawLine(width * game.TILE_SIZE, 0, rect)
+
+
+
+class SnakeLineRenderer(object):
+    """
+    Draws the whole snake as one thick line through the middle of its tiles, with a point only
+    where it bends. The canvas holds the same number of items however long the snake gets, and
+    moving the snake only changes the points of the line. Food tiles are drawn the same way as
+    TileRenderer draws them.
+    """
+    SNAKE_KEY = "snake"
+
+    def Reset(self, game):
+        yg.clearGroup(game.BOARD_GROUP)
+
+    def Scroll(self, game, dx, dy, cells):
+        RemoveTiles(cells)
+
+    def Draw(self, game, cells):
+        for row, col in cells:
+            tile = game.board[row][col]
+            if tile == game.TILE_ID_FOOD:
+                x, y = game.CellPosition(row, col)
+                game.DrawTile(x, y, game.TILE_SIZE, game.TILE_COLOURS[tile], (row, col))
+            else:
+                yg.removeShape((row, col))
+
+        yg.setLineColour(game.TILE_COLOUR_SNAKE)
+        yg.setLineThickness(game.TILE_SIZE)
+        yg.drawPolyline(self.GetPoints(game), self.SNAKE_KEY)
+
+    def GetPoints(self, game):
+        """
+        Return the screen positions of the middle of the snake's head, its tail and every tile
+        it bends on. The ends are moved out by half a tile so the line covers the head and tail.
+        """
+        half = game.TILE_SIZE // 2
+        points = []
+        for seg in game.snake:
+            x, y = game.CellPosition(seg.y, seg.x)
+            point = (x + half, y + half)
+            if len(points) > 0 and point == points[-1]:
+                continue  # a new segment which has not moved off the end of the tail yet
+            if len(points) > 1 and IsStraight(points[-2], points[-1], point):
+                points[-1] = point
+            else:
+                points.append(point)
+
+        if len(points) == 1:
+            x, y = points[0]
+            return [(x - half, y), (x + half, y)]
+
+        # Where the snake turns back on itself the line would stop in the middle of the tile, so the
+        # point is moved to the far side of it.
+        for i in range(1, len(points) - 1):
+            if Direction(points[i - 1], points[i]) == Direction(points[i + 1], points[i]):
+                points[i] = MoveAway(points[i], points[i - 1], half)
+
+        points[0] = MoveAway(points[0], points[1], half)
+        points[-1] = MoveAway(points[-1], points[-2], half)
+        return points
+
+
+
+def IsStraight(a, b, c):
+    """
+    Return True if going from a to b then from b to c carries on in the same direction along one
+    horizontal or vertical line. A snake which turns back on itself bends at b.
+    """
+    return Direction(a, b) == Direction(b, c)
+
+def Direction(a, b):
+    """
+    Return the (x, y) signs of the step from point a to point b.
+    """
+    return ((b[0] > a[0]) - (b[0] < a[0]), (b[1] > a[1]) - (b[1] < a[1]))
+
+def MoveAway(point, other, distance):
+    """
+    Return point moved the given distance directly away from other, which must be on the same
+    horizontal or vertical line.
+    """
+    dx, dy = Direction(other, point)
+    return (point[0] + dx*distance, point[1] + dy*distance)
+
+
+
+class ImageRenderer(object):
+    """
+    Draws the whole board into a single image, so the canvas only ever holds one item for the
+    board, however big it is or however long the snake gets. A changed cell is a single fill
+    of its square in the image.
+    """
+    IMAGE_KEY = "board"
+
+    def Reset(self, game):
+        width = game.TILES_HORIZONTAL * game.TILE_SIZE
+        height = game.TILES_VERTICAL * game.TILE_SIZE
+
+        yg.moveTo(0, 0)
+        yg.drawBlankImage(width, height, self.IMAGE_KEY)
+        yg.fillImage(self.IMAGE_KEY, 0, 0, width, height, game.TILE_COLOUR_EMPTY)
+
+    def Draw(self, game, cells):
+        for row, col in cells:
+            x, y = game.CellPosition(row, col)
+            yg.fillImage(self.IMAGE_KEY, x, y, game.TILE_SIZE, game.TILE_SIZE,
+                         game.TILE_COLOURS[game.board[row][col]])
+
+
+
+class TexturedRenderer(ImageRenderer):
+    """
+    Draws the board into a single image like ImageRenderer, but copies a sprite from an atlas (see
+    yg.loadAtlas()) into each snake and food tile instead of filling it with a colour. The atlas
+    file is only read once, and copying a sprite in makes no new images.
+
+    The snake's head, tail, straight parts and corners each have a sprite for every way they can
+    face, so a snake tile's sprite depends on the tiles next to it and can change without the tile
+    itself changing, e.g. the old head becomes a body tile when the snake moves. The sprite of every
+    snake tile on the screen is worked out each frame, and only the ones which are different to
+    what is already in the image are copied in.
+    """
+    ATLAS_NAME = "sprites"
+
+    # The sprites in the default atlas, in the order they are laid out in the file, four TILE_SIZE
+    # squares to a row. Heads and tails are named by the way they point, body parts by the two
+    # sides they join up to.
+    SPRITE_NAMES = ["head_n", "head_e", "head_s", "head_w",
+                    "tail_n", "tail_e", "tail_s", "tail_w",
+                    "body_ns", "body_ew", "body_ne", "body_nw",
+                    "body_se", "body_sw", "food"]
+    SPRITE_COLUMNS = 4
+
+    # The side of a tile the next tile is on, by the (row, column) step to it
+    SIDES = {(-1, 0): "n", (1, 0): "s", (0, 1): "e", (0, -1): "w"}
+
+    def __init__(self, filename = "sprites.gif", regions = None):
+        """
+        Param filename: the atlas image file.
+        Param regions: dictionary mapping each name in SPRITE_NAMES to the (x, y, width, height) of
+                       its sprite in the file. Defaults to the layout of SPRITE_NAMES.
+        """
+        self.filename = filename
+        self.regions = regions
+        self.loaded = False
+
+    def Reset(self, game):
+        if not self.loaded:
+            if self.regions == None:
+                self.regions = GridRegions(self.SPRITE_NAMES, game.TILE_SIZE, self.SPRITE_COLUMNS)
+            yg.loadAtlas(self.ATLAS_NAME, self.filename, self.regions)
+            self.loaded = True
+
+        ImageRenderer.Reset(self, game)
+        self.sprites = {}  # (row, column) -> the sprite in that tile of the image
+
+    def Draw(self, game, cells):
+        wanted = self.SnakeSprites(game)
+        for cell in cells:
+            tile = game.board[cell[0]][cell[1]]
+            if tile == game.TILE_ID_FOOD:
+                wanted[cell] = "food"
+            elif tile == game.TILE_ID_EMPTY and cell in self.sprites:
+                del self.sprites[cell]
+                x, y = game.CellPosition(cell[0], cell[1])
+                yg.fillImage(self.IMAGE_KEY, x, y, game.TILE_SIZE, game.TILE_SIZE, game.TILE_COLOUR_EMPTY)
+
+        for cell, sprite in wanted.items():
+            if self.sprites.get(cell) != sprite:
+                self.sprites[cell] = sprite
+                x, y = game.CellPosition(cell[0], cell[1])
+                yg.fillImage(self.IMAGE_KEY, x, y, game.TILE_SIZE, game.TILE_SIZE, game.TILE_COLOUR_EMPTY)
+                yg.blitImage(self.IMAGE_KEY, self.ATLAS_NAME, sprite, x, y)
+
+    def SnakeSprites(self, game):
+        """
+        Return a dictionary mapping each snake tile on the screen to the name of its sprite.
+        """
+        cells = SnakeCells(game)
+        sprites = {}
+        for i in range(len(cells)):
+            # When the snake turns back on itself it covers a tile twice, and the part nearest the
+            # head is the one on top.
+            if cells[i] in sprites or not game.IsCellVisible(cells[i][0], cells[i][1]):
+                continue
+            if len(cells) == 1:
+                sprites[cells[i]] = "head_" + self.HeadSide(game)
+            elif i == 0:
+                sprites[cells[i]] = "head_" + self.Side(cells[1], cells[0])
+            elif i == len(cells) - 1:
+                sprites[cells[i]] = "tail_" + self.Side(cells[i - 1], cells[i])
+            else:
+                sides = self.Side(cells[i], cells[i - 1]) + self.Side(cells[i], cells[i + 1])
+                if sides[0] == sides[1]:
+                    # Both sides lead to the same tile, so there is no corner to draw
+                    sprites[cells[i]] = "body_ns" if sides[0] in "ns" else "body_ew"
+                else:
+                    sprites[cells[i]] = "body_" + "".join(sorted(sides, key = "nsew".index))
+        return sprites
+
+    def HeadSide(self, game):
+        """
+        Return the way the snake's head is moving, as "n", "s", "e" or "w". A snake which isn't moving
+        faces east.
+        """
+        head = game.snake[0]
+        sides = {head.MOVING_UP: "n", head.MOVING_DOWN: "s", head.MOVING_RIGHT: "e", head.MOVING_LEFT: "w"}
+        return sides.get(head.direction, "e")
+
+    def Side(self, cell, other):
+        """
+        Return which side of cell the tile other is on, as "n", "s", "e" or "w".
+        """
+        return self.SIDES[(other[0] - cell[0], other[1] - cell[1])]
+
+
+
+def SnakeCells(game):
+    """
+    Return the (row, column) tiles of the snake, head first, without the new segments still on
+    the tail.
+    """
+    cells = []
+    for seg in game.snake:
+        cell = (seg.y, seg.x)
+        if len(cells) == 0 or cell != cells[-1]:
+            cells.append(cell)
+    return cells
+
+def RemoveTiles(cells):
+    """
+    Remove the shapes keyed by the given (row, column) cells, e.g. the tiles drawn by
+    Game.DrawTile() which have gone off the screen.
+    """
+    for cell in cells:
+        yg.removeShape(cell)
+
+def GridRegions(names, size, columns):
+    """
+    Return the atlas regions (see yg.loadAtlas()) of sprites laid out as squares in rows, in the order
+    of names.
+
+    Param names: the sprite names, from left to right along the top row then along each row below.
+    Param size: the width and height of each sprite in pixels.
+    Param columns: the number of sprites on each row.
+    """
+    regions = {}
+    for i in range(len(names)):
+        regions[names[i]] = ((i % columns) * size, (i // columns) * size, size, size)
+    return regions
+
+
+
+class AnimatedRenderer(object):
+    """
+    Slides the snake smoothly from one tile to the next in the frames between its moves (see
+    Animate() at the top of the file), instead of jumping a whole tile at a time.
+
+    The snake is a square for every tile apart from its head, plus two more squares for the ends,
+    which are moved a fraction of a tile each frame: the head square slides forward out of the
+    head tile, and the tail square slides after it along the body. Nothing is drawn again for
+    this, the end squares are only moved on the canvas. When the snake moves, the square on the
+    tile the body has left is moved to the tile it has reached, so a move does not make or delete
+    any canvas items either. Food tiles are drawn the same way as TileRenderer draws them.
+    """
+    HEAD_KEY = "snakeHead"
+    TAIL_KEY = "snakeTail"
+
+    def Reset(self, game):
+        yg.clearGroup(game.BOARD_GROUP)
+        self.fromCells = None  # the snake's tiles before the last move, head first
+        self.toCells = None    # the snake's tiles after the last move
+        self.body = set()      # tiles with a body square, each keyed ("snake", row, column)
+        self.ends = {}         # key of each end square -> its (x, y) on the screen
+
+    def Scroll(self, game, dx, dy, cells):
+        # Body squares which have gone off the screen are removed by DrawBody()
+        RemoveTiles(cells)
+        for key, (x, y) in self.ends.items():
+            self.ends[key] = (x + dx, y + dy)
+
+    def Draw(self, game, cells):
+        for row, col in cells:
+            if game.board[row][col] == game.TILE_ID_FOOD:
+                x, y = game.CellPosition(row, col)
+                game.DrawTile(x, y, game.TILE_SIZE, game.TILE_COLOURS[game.TILE_ID_FOOD], (row, col))
+            else:
+                yg.removeShape((row, col))
+
+        snake = SnakeCells(game)
+        if self.toCells == None:
+            self.fromCells = snake
+        else:
+            self.fromCells = self.toCells
+        self.toCells = snake
+
+        self.DrawBody(game, set(cell for cell in snake[1:] if game.IsCellVisible(cell[0], cell[1])))
+        if len(self.ends) == 0:
+            self.DrawEnd(game, self.HEAD_KEY, snake[0])
+            self.DrawEnd(game, self.TAIL_KEY, snake[-1])
+        self.Animate(game, 0)
+
+    def DrawBody(self, game, body):
+        """
+        Put a body square on each of the given tiles, reusing the squares on tiles which are no
+        longer part of the body.
+        """
+        left = list(self.body - body)
+        for row, col in body - self.body:
+            x, y = game.CellPosition(row, col)
+            if len(left) > 0:
+                oldRow, oldCol = left.pop()
+                oldX, oldY = game.CellPosition(oldRow, oldCol)
+                yg.rekeyShape(("snake", oldRow, oldCol), ("snake", row, col))
+                yg.moveShape(("snake", row, col), x - oldX, y - oldY)
+            else:
+                game.DrawTile(x, y, game.TILE_SIZE, game.TILE_COLOUR_SNAKE, ("snake", row, col))
+        for row, col in left:
+            yg.removeShape(("snake", row, col))
+        self.body = body
+
+    def DrawEnd(self, game, key, cell):
+        x, y = game.CellPosition(cell[0], cell[1])
+        game.DrawTile(x, y, game.TILE_SIZE, game.TILE_COLOUR_SNAKE, key)
+        self.ends[key] = (x, y)
+
+    def Animate(self, game, fraction):
+        self.MoveEnd(game, self.HEAD_KEY, self.fromCells[0], self.toCells[0], fraction)
+        self.MoveEnd(game, self.TAIL_KEY, self.fromCells[-1], self.toCells[-1], fraction)
+
+    def MoveEnd(self, game, key, fromCell, toCell, fraction):
+        """
+        Move an end square the given fraction of the way from one tile to another.
+        """
+        fromX, fromY = game.CellPosition(fromCell[0], fromCell[1])
+        toX, toY = game.CellPosition(toCell[0], toCell[1])
+        x = fromX + (toX - fromX) * fraction
+        y = fromY + (toY - fromY) * fraction
+        oldX, oldY = self.ends[key]
+        if x != oldX or y != oldY:
+            yg.moveShape(key, x - oldX, y - oldY)
+            self.ends[key] = (x, y)
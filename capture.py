@@ -0,0 +1,232 @@
+# capture.py
+"""Recording frames as animated GIFs or video
+
+The encoders here take an iterator of frames, each a tuple
+(width, height, data) like york_graphics.grabFrame returns, and write
+them out one at a time as they are pulled from it. Only the frame being
+encoded (and for GIFs the one before it) is kept in memory, so long
+recordings can be made from a generator:
+
+--------------------------------------------------------------------
+import capture, game
+
+snakeGame = game.Game()
+capture.writeGIF("run.gif", snakeGame.CaptureFrames(scale=2))
+--------------------------------------------------------------------
+
+GIFs use a fixed palette of 216 colors (6 levels each of red, green and
+blue), so colors in between are rounded to the nearest of those. Only
+the part of each frame which changed since the previous one is encoded.
+
+writeVideo pipes raw frames to ffmpeg, if it is installed, which can
+write any format it supports. writeRaw writes the raw frames to a file
+object instead, e.g. sys.stdout.buffer to pipe them to another
+encoder."""
+
+import shutil, struct, subprocess
+
+import graphics
+
+##########################################################################
+# Animated GIFs
+
+# Index of each red, green and blue byte's level in the palette, scaled
+# so that the three can be added together into a palette index
+_RED_INDEX = bytes(36 * ((v * 5 + 127) // 255) for v in range(256))
+_GREEN_INDEX = bytes(6 * ((v * 5 + 127) // 255) for v in range(256))
+_BLUE_INDEX = bytes((v * 5 + 127) // 255 for v in range(256))
+
+_PALETTE = b"".join(bytes((51 * r, 51 * g, 51 * b))
+                    for r in range(6) for g in range(6) for b in range(6))
+_PALETTE = _PALETTE + bytes(3 * (256 - 216))
+
+def writeGIF(filename, frames, delay=10, loop=True):
+    """Writes frames to filename as an animated GIF, encoding each frame
+    as it is taken from the iterator. delay is the time each frame is
+    shown for, in hundredths of a second. Returns the number of frames
+    written."""
+    with open(filename, "wb") as file:
+        return encodeGIF(file, frames, delay, loop)
+
+
+def encodeGIF(file, frames, delay=10, loop=True):
+    """Like writeGIF but writes to a binary file object"""
+    count = 0
+    previous = None
+    for width, height, data in frames:
+        if previous is None:
+            _writeHeader(file, width, height, loop)
+            rect = (0, 0, width, height)
+        else:
+            rect = _changedRect(previous, data, width, height)
+        _writeFrame(file, data, width, rect, delay)
+        previous = data
+        count = count + 1
+    if previous is None:
+        raise graphics.GraphicsError("no frames to write")
+    file.write(b";")
+    return count
+
+
+def _writeHeader(file, width, height, loop):
+    # Screen descriptor with a 256 color global palette
+    file.write(b"GIF89a")
+    file.write(struct.pack("<HHBBB", width, height, 0xF7, 0, 0))
+    file.write(_PALETTE)
+    if loop:
+        file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+
+def _writeFrame(file, data, width, rect, delay):
+    left, top, right, bottom = rect
+    # Graphic control: keep the previous frame under this one
+    file.write(struct.pack("<3sBHBB", b"!\xf9\x04", 0x04, delay, 0, 0))
+    file.write(struct.pack("<BHHHHB", 0x2C, left, top,
+                           right - left, bottom - top, 0))
+    stride = width * 3
+    rgb = b"".join(bytes(data[y * stride + left * 3:y * stride + right * 3])
+                   for y in range(top, bottom))
+    file.write(b"\x08")
+    compressed = _lzw(_quantise(rgb), 8)
+    for i in range(0, len(compressed), 255):
+        block = compressed[i:i + 255]
+        file.write(bytes((len(block),)))
+        file.write(block)
+    file.write(b"\x00")
+
+
+def _quantise(rgb):
+    # Returns the palette index of each r,g,b pixel. The three scaled
+    # levels add up to at most 215, so adding them as big integers never
+    # carries from one byte into the next.
+    count = len(rgb) // 3
+    red = rgb[0::3].translate(_RED_INDEX)
+    green = rgb[1::3].translate(_GREEN_INDEX)
+    blue = rgb[2::3].translate(_BLUE_INDEX)
+    total = (int.from_bytes(red, "big") + int.from_bytes(green, "big")
+             + int.from_bytes(blue, "big"))
+    return total.to_bytes(count, "big")
+
+
+def _changedRect(previous, data, width, height):
+    # Returns the smallest (left, top, right, bottom) rectangle containing
+    # every pixel which differs between two frames. GIF frames must have
+    # at least one pixel, so an unchanged frame gives the top left pixel.
+    stride = width * 3
+    rows = [y for y in range(height)
+            if previous[y * stride:(y + 1) * stride] != data[y * stride:(y + 1) * stride]]
+    if not rows:
+        return (0, 0, 1, 1)
+    left, right = width, 0
+    for y in rows:
+        old = previous[y * stride:(y + 1) * stride]
+        new = data[y * stride:(y + 1) * stride]
+        left = min(left, _firstDifference(old, new) // 3)
+        right = max(right, width - _firstDifference(old[::-1], new[::-1]) // 3)
+    return (left, rows[0], right, rows[-1] + 1)
+
+
+def _firstDifference(a, b):
+    # Index of the first byte which differs between a and b, found by
+    # halving so the comparisons are done by the bytes type
+    low, high = 0, len(a)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle
+    return low
+
+
+def _lzw(indices, minCodeSize):
+    # Compresses a string of palette indices with GIF's variable length
+    # LZW, returning the packed bytes
+    clearCode = 1 << minCodeSize
+    endCode = clearCode + 1
+    out = bytearray()
+    codeSize = minCodeSize + 1
+    codes = {}
+    nextCode = endCode + 1
+    # Unwritten bits, starting with a clear code
+    bits = clearCode
+    bitCount = codeSize
+    prefix = indices[0]
+    for index in indices[1:]:
+        key = (prefix << 8) | index
+        code = codes.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        bits = bits | (prefix << bitCount)
+        bitCount = bitCount + codeSize
+        while bitCount >= 8:
+            out.append(bits & 0xFF)
+            bits = bits >> 8
+            bitCount = bitCount - 8
+        if nextCode < 4096:
+            codes[key] = nextCode
+            nextCode = nextCode + 1
+            if nextCode > (1 << codeSize):
+                codeSize = codeSize + 1
+        else:
+            # The table is full, so start a new one
+            bits = bits | (clearCode << bitCount)
+            bitCount = bitCount + codeSize
+            codes = {}
+            nextCode = endCode + 1
+            codeSize = minCodeSize + 1
+        prefix = index
+    for code in (prefix, endCode):
+        bits = bits | (code << bitCount)
+        bitCount = bitCount + codeSize
+    while bitCount > 0:
+        out.append(bits & 0xFF)
+        bits = bits >> 8
+        bitCount = bitCount - 8
+    return bytes(out)
+
+##########################################################################
+# Raw frames and video
+
+def writeRaw(file, frames):
+    """Writes the r,g,b data of each frame to a binary file object, with
+    nothing in between. Returns the number of frames written."""
+    count = 0
+    for width, height, data in frames:
+        file.write(data)
+        count = count + 1
+    return count
+
+
+def findEncoder():
+    """Returns the path of ffmpeg, or None if it is not installed"""
+    return shutil.which("ffmpeg")
+
+
+def writeVideo(filename, frames, fps=10, encoder=None):
+    """Pipes frames to ffmpeg, which writes them to filename in the format
+    given by its extension. encoder is the path of ffmpeg if it is not on
+    the PATH. Returns the number of frames written."""
+    if encoder is None:
+        encoder = findEncoder()
+    if encoder is None:
+        raise graphics.GraphicsError("ffmpeg is not installed")
+    frames = iter(frames)
+    first = next(frames, None)
+    if first is None:
+        raise graphics.GraphicsError("no frames to write")
+    width, height, data = first
+    command = [encoder, "-loglevel", "error", "-y",
+               "-f", "rawvideo", "-pix_fmt", "rgb24",
+               "-s", "%dx%d" % (width, height), "-r", str(fps),
+               "-i", "-", filename]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        process.stdin.write(data)
+        count = 1 + writeRaw(process.stdin, frames)
+    finally:
+        process.stdin.close()
+        if process.wait() != 0:
+            raise graphics.GraphicsError("ffmpeg failed")
+    return count
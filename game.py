@@ -1,8 +1,10 @@
 import york_graphics as yg
+import os
 from random import randint
-from time import sleep
+from time import sleep, monotonic
 
 import menu
+import board
 
 """
 TODO:
@@ -36,18 +38,23 @@ class SnakeSegment(object):
         self.nextdirection = self.MOVING_STILL   # the next direction the snake will move after the current move
 
     @staticmethod
-    def AddSegment(snake, board, snakeTileId):
+    def AddSegment(snake, board, snakeTileId, dirty = None):
         """
         Add a snake segment to the end of the snake.
 
         Param snake: the snake array.
         Param board: the 2D board array.
         Param snakeTileId: the tile Id of the snake so it can be put on the board.
+        Param dirty: the game's dirty cells dictionary, see Game.SetTile(). Pass None if the
+                     board is not being drawn.
         """
         lastseg = snake[len(snake) - 1]
         lastx = lastseg.x
         lasty = lastseg.y
 
+        if dirty != None and (lasty, lastx) not in dirty:
+            dirty[(lasty, lastx)] = board[lasty][lastx]
+
         if lastseg.direction == SnakeSegment.MOVING_RIGHT:
             newseg = SnakeSegment(lastx, lasty)
             newseg.direction = SnakeSegment.MOVING_RIGHT
@@ -91,6 +98,9 @@ class Game(object):
     TILE_COLOUR_EMPTY = yg.getRGBColour(0, 255, 0)
     TILE_COLOUR_SNAKE = yg.getRGBColour(0, 0, 0)
     TILE_COLOUR_FOOD  = yg.getRGBColour(0, 0, 255)
+    TILE_COLOURS = {TILE_ID_EMPTY: TILE_COLOUR_EMPTY,
+                    TILE_ID_SNAKE: TILE_COLOUR_SNAKE,
+                    TILE_ID_FOOD:  TILE_COLOUR_FOOD}
 
     # Make sure the tiles fit onto the screen perfectly
     assert SCREEN_WIDTH % TILE_SIZE == 0
@@ -99,17 +109,51 @@ class Game(object):
     TILES_HORIZONTAL = SCREEN_WIDTH // TILE_SIZE  # number of tiles on screen on the x axis
     TILES_VERTICAL = SCREEN_HEIGHT // TILE_SIZE   # number of tiles on screen on the y axis
 
+    TICK_TIME = 0.1   # seconds between moves of the snake
+    FRAME_RATE = 60   # frames per second drawn by renderers which animate the snake between moves, see board.py
+    MAX_CATCH_UP = 5  # most moves made in a row to catch up after a slow frame, any more are skipped
+
+    CAMERA_MARGIN = 4  # the camera scrolls when the snake's head gets closer than this many tiles to the edge of the screen
+
     SCORES_FILE = "scores.txt"  # file name of the text file scores are saved to
+    SPRITES_FILE = "sprites.gif"  # file name of the atlas the snake and food sprites are in, see board.TexturedRenderer
+
+    # Groups the shapes on the canvas are put in, see yg.setGroup()
+    BOARD_GROUP = "board"
+    HUD_GROUP   = "hud"
+    MENU_GROUP  = "menu"
     
-    def __init__(self):
+    def __init__(self, renderer = None, boardWidth = None, boardHeight = None):
         """
         Set the board up ready for use in the game.
+
+        Param renderer: the board renderer to draw the board with, see board.py. If not given, the
+                        board is drawn as a single image if the window can draw images, with sprites
+                        if SPRITES_FILE is there, otherwise the snake is drawn as a single line.
+        Param boardWidth, boardHeight: the size of the board in tiles. If the board is bigger than the
+                                       screen, the camera follows the snake's head around it. Defaults
+                                       to the size of the screen.
         """
+        self.renderer = renderer
+
+        if boardWidth == None:
+            boardWidth = self.TILES_HORIZONTAL
+        if boardHeight == None:
+            boardHeight = self.TILES_VERTICAL
+        self.boardWidth = boardWidth
+        self.boardHeight = boardHeight
+
         self.firstGame = True
         self.activeMenu = None
+        self.drawnMenu = None  # the menu whose buttons are on the canvas
         self.showingStartScreen = True  # True if the start screen is being displayed instead of the play again screen, false if the other way round
         self.playingAgain = False
 
+        # Moves which missed their time, see Run(). Late ones were made as soon as the game caught up,
+        # skipped ones were dropped because the game had fallen more than MAX_CATCH_UP moves behind.
+        self.lateMoves = 0
+        self.skippedMoves = 0
+
     def Init(self, isPlayingAgain = False):
         """
         Initialise the game. MAKE SURE THIS HAS BEEN CALLED BEFORE ENTERING THE MAIN GAME LOOP EVERYTIME.
@@ -118,10 +162,21 @@ class Game(object):
         # menu, do not do it.
         if self.firstGame:
             yg.openWindow(width = self.SCREEN_WIDTH, height = self.SCREEN_HEIGHT, title = "Snake Assignment")
+
+            # Menus are always drawn over the score, which is drawn over the board.
+            yg.setLayers([self.BOARD_GROUP, self.HUD_GROUP, self.MENU_GROUP])
             
             # Move the window to the top left of the screen to stop the bottom not being shown
-            # on my laptop. Unfortunately, I had modify a private variable.
-            yg._window.master.geometry("%ix%i+%i+%i" % (self.SCREEN_WIDTH, self.SCREEN_HEIGHT, 100, 10))
+            # on my laptop.
+            yg.setWindowPosition(100, 10)
+
+            if self.renderer == None:
+                if yg.canDrawImages() and os.path.exists(self.SPRITES_FILE):
+                    self.renderer = board.TexturedRenderer(self.SPRITES_FILE)
+                elif yg.canDrawImages():
+                    self.renderer = board.ImageRenderer()
+                else:
+                    self.renderer = board.SnakeLineRenderer()
 
             self.activeMenu = menu.StartMenu(self.SCREEN_WIDTH, self.Start, self.ViewHighScores, self.Quit)
             self.firstGame = False
@@ -129,6 +184,29 @@ class Game(object):
         if isPlayingAgain:
             self.activeMenu = None
 
+        self.Reset()
+        snakex = self.snake[0].x
+        snakey = self.snake[0].y
+
+        # Start with the head in the middle of the screen. The camera has not been drawn from yet,
+        # so DrawBoard() gets rid of the last game's tiles.
+        self.cameraCol = self.FollowAxis(snakex - self.TILES_HORIZONTAL // 2, snakex, self.TILES_HORIZONTAL, self.boardWidth)
+        self.cameraRow = self.FollowAxis(snakey - self.TILES_VERTICAL // 2, snakey, self.TILES_VERTICAL, self.boardHeight)
+        self.drawnCamera = None
+        yg.beginFrame()
+        self.DrawBoard()
+        yg.setGroup(None)
+        yg.endFrame()
+
+        # The game is in the process of quitting. This means the main game loop will finish its current
+        # loop then the game will close.
+        self.quitting = False
+
+    def Reset(self):
+        """
+        Start a new game on an empty board. Nothing is drawn, so games can be played without a window
+        of their own, e.g. by spectator.py.
+        """
         self.maxFoodTiles = 1
         self.nFoodTiles = 0
 
@@ -138,56 +216,192 @@ class Game(object):
 
         self.board = []  # hold the board tiles
         self.snake = []  # hold the snake segments
+
+        # The cells written since the board was last drawn, mapped to the tile they held before
+        # the first write. See SetTile().
+        self.dirty = {}
         
         # Fill the board array with empty tiles.
-        for i in range(self.TILES_VERTICAL):
+        for i in range(self.boardHeight):
             row = []
-            for j in range(self.TILES_HORIZONTAL):
+            for j in range(self.boardWidth):
                 row.append(self.TILE_ID_EMPTY)
             self.board.append(row)
 
         # Spawn the snakes head
-        snakex = randint(0, self.TILES_HORIZONTAL - 1)
-        snakey = randint(0, self.TILES_VERTICAL - 1)
-        self.board[snakey][snakex] = self.TILE_ID_SNAKE
+        snakex = randint(0, self.boardWidth - 1)
+        snakey = randint(0, self.boardHeight - 1)
+        self.SetTile(snakey, snakex, self.TILE_ID_SNAKE)
         self.snake.append(SnakeSegment(snakex, snakey))
 
         self.scoreText = menu.Text("Score: 0", 75, 50, 12, yg.getRGBColour(0, 0, 0))
 
-        self.DrawBoard()
-
-        # The game is in the process of quitting. This means the main game loop will finish its current
-        # loop then the game will close.
-        self.quitting = False
-
-    def DrawTile(self, x, y, size, colour):
+    def DrawTile(self, x, y, size, colour, key = None):
         """
         Draw a single square at a given position, with a given size and colour,
         on the screen. Note the size, is both the width and height.
+
+        If a key is given the square stays on the canvas between frames, and drawing with
+        the same key again only changes it if the position or colour is different.
         """
         yg.moveTo(x, y + (size / 2))
         yg.setLineColour(colour)
         yg.setLineThickness(size)
-        yg.drawLine(size, 0)
+        yg.drawLine(size, 0, key)
+
+    def SetTile(self, row, col, tileId):
+        """
+        Put a tile on the board. ALWAYS use this rather than writing to the board array, so
+        the cell gets redrawn by DrawBoard().
+        """
+        if (row, col) not in self.dirty:
+            self.dirty[(row, col)] = self.board[row][col]
+        self.board[row][col] = tileId
+
+    def TakeDirtyCells(self):
+        """
+        Return the cells written since this was last called which now hold a different tile, and
+        forget about them. A cell which was written but ended up holding the same tile, like the
+        middle of the snake when it moves, is left out. DrawBoard() calls this, so anything else
+        following the board's changes must draw the board itself.
+        """
+        cells = []
+        for cell, oldTile in self.dirty.items():
+            if self.board[cell[0]][cell[1]] != oldTile:
+                cells.append(cell)
+        self.dirty = {}
+        return cells
+
+    def FollowAxis(self, camera, position, viewSize, boardSize):
+        """
+        Return the new camera position on one axis, moved so that position is at least
+        CAMERA_MARGIN tiles inside the view but not showing anything past the end of the board.
+        """
+        margin = min(self.CAMERA_MARGIN, (viewSize - 1) // 2)
+        if position < camera + margin:
+            camera = position - margin
+        elif position > camera + viewSize - 1 - margin:
+            camera = position - viewSize + 1 + margin
+        return max(0, min(camera, boardSize - viewSize))
+
+    def UpdateCamera(self):
+        """
+        Scroll the camera to follow the snake's head. The camera is the (row, column) of the board
+        tile shown in the top left of the screen.
+        """
+        head = self.snake[0]
+        self.cameraCol = self.FollowAxis(self.cameraCol, head.x, self.TILES_HORIZONTAL, self.boardWidth)
+        self.cameraRow = self.FollowAxis(self.cameraRow, head.y, self.TILES_VERTICAL, self.boardHeight)
+
+    def CellPosition(self, row, col):
+        """
+        Return the (x, y) pixel position on the screen of the top left of a board tile.
+        """
+        return ((col - self.cameraCol) * self.TILE_SIZE, (row - self.cameraRow) * self.TILE_SIZE)
+
+    def IsCellVisible(self, row, col):
+        return (self.cameraRow <= row < self.cameraRow + self.TILES_VERTICAL and
+                self.cameraCol <= col < self.cameraCol + self.TILES_HORIZONTAL)
+
+    def ViewCells(self, camera, other = None):
+        """
+        Return the cells on the screen when the camera is at camera, a (row, column), leaving out
+        any which would also be on the screen with the camera at other.
+        """
+        cells = []
+        for row in range(camera[0], min(camera[0] + self.TILES_VERTICAL, self.boardHeight)):
+            inOther = other != None and other[0] <= row < other[0] + self.TILES_VERTICAL
+            for col in range(camera[1], min(camera[1] + self.TILES_HORIZONTAL, self.boardWidth)):
+                if not (inOther and other[1] <= col < other[1] + self.TILES_HORIZONTAL):
+                    cells.append((row, col))
+        return cells
 
     def DrawBoard(self):
-        yg.clearCanvas()
+        """
+        Only the cells on the screen are ever looked at, so drawing costs the same however big
+        the board is.
+
+        Normally only the cells written since the last call are redrawn, the renderer keeps the
+        rest of the board on the canvas as it is. A cell which was written but ended up holding the
+        same tile, like the middle of the snake when it moves, is skipped. When the camera scrolls by
+        a tile, everything drawn is moved across with the board group and only the tiles which have
+        come onto the screen are drawn, if the renderer can scroll (see board.py). When it jumps
+        further, or the renderer can't scroll, the renderer is reset and every tile on the screen
+        which is not empty is drawn.
+        """
+        yg.setGroup(self.BOARD_GROUP)
         yg.setCanvasColour(self.TILE_COLOUR_EMPTY)
-        for row in range(self.TILES_VERTICAL):
-            for col in range(self.TILES_HORIZONTAL):
-                if self.board[row][col] == self.TILE_ID_SNAKE:
-                    self.DrawTile(col*self.TILE_SIZE, row*self.TILE_SIZE, self.TILE_SIZE, self.TILE_COLOUR_SNAKE)
-                elif self.board[row][col] == self.TILE_ID_FOOD:
-                    self.DrawTile(col*self.TILE_SIZE, row*self.TILE_SIZE, self.TILE_SIZE, self.TILE_COLOUR_FOOD)
-
-    def Draw(self):        
+        self.UpdateCamera()
+        camera = (self.cameraRow, self.cameraCol)
+        changed = self.TakeDirtyCells()
+        cells = []
+        if camera == self.drawnCamera:
+            newCells = []
+        elif (self.drawnCamera != None and hasattr(self.renderer, "Scroll") and
+                abs(camera[0] - self.drawnCamera[0]) <= 1 and abs(camera[1] - self.drawnCamera[1]) <= 1):
+            dx = (self.drawnCamera[1] - camera[1]) * self.TILE_SIZE
+            dy = (self.drawnCamera[0] - camera[0]) * self.TILE_SIZE
+            yg.moveGroup(self.BOARD_GROUP, dx, dy)
+            self.renderer.Scroll(self, dx, dy, self.ViewCells(self.drawnCamera, camera))
+            newCells = self.ViewCells(camera, self.drawnCamera)
+        else:
+            self.renderer.Reset(self)
+            newCells = self.ViewCells(camera)
+            changed = []
+        self.drawnCamera = camera
+
+        for cell in newCells:
+            if self.board[cell[0]][cell[1]] != self.TILE_ID_EMPTY:
+                cells.append(cell)
+        newCells = set(newCells)
+        for cell in changed:
+            if self.IsCellVisible(cell[0], cell[1]) and cell not in newCells:
+                cells.append(cell)
+        self.renderer.Draw(self, cells)
+
+    def Draw(self):
+        # Batch the whole frame into a single window update.
+        yg.beginFrame()
+        yg.clearCanvas()
         self.DrawBoard()
+
+        yg.setGroup(self.HUD_GROUP)
         self.scoreText.Draw()
 
+        # The buttons of a menu stay on the canvas until the menu changes. When it is closed or
+        # replaced, its shapes are removed from its layer, which doesn't touch anything underneath.
+        if self.activeMenu is not self.drawnMenu:
+            yg.clearGroup(self.MENU_GROUP)
+            self.drawnMenu = self.activeMenu
+
         if self.activeMenu != None:
+            yg.setGroup(self.MENU_GROUP)
             self.activeMenu.Draw()
 
+        yg.setGroup(None)
         yg.updateCanvas()
+        yg.endFrame()
+
+    def AnimationFrames(self):
+        """
+        Return the number of frames drawn for each move of the snake, 1 if the renderer can't
+        animate it.
+        """
+        if hasattr(self.renderer, "Animate") and self.activeMenu == None:
+            return max(1, int(self.TICK_TIME * self.FRAME_RATE))
+        return 1
+
+    def DrawAnimation(self, fraction):
+        """
+        Draw a frame in between two moves of the snake. Only the renderer draws anything, the rest
+        of the screen stays as Draw() left it.
+        Param fraction: how far through the move the frame is, from 0 to 1.
+        """
+        yg.beginFrame()
+        yg.setGroup(self.BOARD_GROUP)
+        self.renderer.Animate(self, fraction)
+        yg.setGroup(None)
+        yg.endFrame()
 
     def HandleInput(self):
         """
@@ -212,10 +426,10 @@ class Game(object):
         and there are less than the maximum amount of tiles currently on the board. The maximum amount
         increases as the snake's length increases.
         """
-        spawnx = randint(0, self.TILES_HORIZONTAL - 1)
-        spawny = randint(0, self.TILES_VERTICAL - 1)
+        spawnx = randint(0, self.boardWidth - 1)
+        spawny = randint(0, self.boardHeight - 1)
         if self.board[spawny][spawnx] == self.TILE_ID_EMPTY and self.nFoodTiles < self.maxFoodTiles:
-            self.board[spawny][spawnx] = self.TILE_ID_FOOD
+            self.SetTile(spawny, spawnx, self.TILE_ID_FOOD)
             self.nFoodTiles += 1         
 
     def GetNextTile(self, index, direction = None):
@@ -245,7 +459,7 @@ class Game(object):
                 return (self.board[self.snake[index].y][self.snake[index].x - 1], self.snake[index].y, self.snake[index].x - 1)
         
         if direction == SnakeSegment.MOVING_RIGHT:
-            if self.snake[index].x + 1 >= self.TILES_HORIZONTAL:
+            if self.snake[index].x + 1 >= self.boardWidth:
                 return (self.TILE_ID_OFF, self.snake[index].y, self.snake[index].x)
             else:                              
                 return (self.board[self.snake[index].y][self.snake[index].x + 1], self.snake[index].y, self.snake[index].x + 1)
@@ -257,7 +471,7 @@ class Game(object):
                 return (self.board[self.snake[index].y - 1][self.snake[index].x], self.snake[index].y - 1, self.snake[index].x)
         
         if direction == SnakeSegment.MOVING_DOWN:
-            if self.snake[index].y + 1 >= self.TILES_VERTICAL:
+            if self.snake[index].y + 1 >= self.boardHeight:
                 return (self.TILE_ID_OFF, self.snake[index].y, self.snake[index].x)
             else:
                 return (self.board[self.snake[index].y + 1][self.snake[index].x], self.snake[index].y + 1, self.snake[index].x)
@@ -273,7 +487,7 @@ class Game(object):
         Return true if food has been eaten, return false if it hasn't.
         """
         if nextTile[0] == self.TILE_ID_FOOD:
-            self.board[nextTile[1]][nextTile[2]] = self.TILE_ID_EMPTY
+            self.SetTile(nextTile[1], nextTile[2], self.TILE_ID_EMPTY)
             self.nFoodTiles -= 1
             self.score += 1
             self.scoreText.SetString("Score: " + str(self.score))
@@ -318,26 +532,26 @@ class Game(object):
             if i == 0:
                 if self.EatFood(nextTile):
                     self.SpawnFood()
-                    SnakeSegment.AddSegment(self.snake, self.board, self.TILE_ID_SNAKE)
+                    SnakeSegment.AddSegment(self.snake, self.board, self.TILE_ID_SNAKE, self.dirty)
 
             if seg.direction == SnakeSegment.MOVING_LEFT:
-                self.board[seg.y][seg.x] = self.TILE_ID_EMPTY
-                self.board[seg.y][seg.x - 1] = self.TILE_ID_SNAKE
+                self.SetTile(seg.y, seg.x, self.TILE_ID_EMPTY)
+                self.SetTile(seg.y, seg.x - 1, self.TILE_ID_SNAKE)
                 seg.x -= 1
 
             if seg.direction == SnakeSegment.MOVING_RIGHT:
-                self.board[seg.y][seg.x] = self.TILE_ID_EMPTY
-                self.board[seg.y][seg.x + 1] = self.TILE_ID_SNAKE
+                self.SetTile(seg.y, seg.x, self.TILE_ID_EMPTY)
+                self.SetTile(seg.y, seg.x + 1, self.TILE_ID_SNAKE)
                 seg.x += 1
 
             if seg.direction == SnakeSegment.MOVING_UP:
-                self.board[seg.y][seg.x] = self.TILE_ID_EMPTY
-                self.board[seg.y - 1][seg.x] = self.TILE_ID_SNAKE
+                self.SetTile(seg.y, seg.x, self.TILE_ID_EMPTY)
+                self.SetTile(seg.y - 1, seg.x, self.TILE_ID_SNAKE)
                 seg.y -= 1
 
             if seg.direction == SnakeSegment.MOVING_DOWN:
-                self.board[seg.y][seg.x] = self.TILE_ID_EMPTY
-                self.board[seg.y + 1][seg.x] = self.TILE_ID_SNAKE
+                self.SetTile(seg.y, seg.x, self.TILE_ID_EMPTY)
+                self.SetTile(seg.y + 1, seg.x, self.TILE_ID_SNAKE)
                 seg.y += 1
 
         # Set the direction of all segments, except the head, to the direction of the one in front.
@@ -391,31 +605,124 @@ class Game(object):
         self.playingAgain = True
         self.activeMenu = None
     
-    def Main(self, isPlayingAgain):
-        if isPlayingAgain:                                            
-            self.Init(True)
-        else:
-            self.Init(False)
-        
-        self.running = True
-        while self.running:                
-            self.HandleInput()
-
-            if self.activeMenu == None:
-                self.Update()
-            else:
-                self.activeMenu.Update()
-
-            self.Draw()
+    def Step(self):
+        """
+        Make one move of the game: handle the user's input, then move the snake, or update the menu
+        if one is open.
+        """
+        self.HandleInput()
 
-            sleep(0.1)
+        if self.activeMenu == None:
+            self.Update()
+        else:
+            self.activeMenu.Update()
 
-        if self.playingAgain:
-            self.Main(True)
+    def Run(self, isPlayingAgain = False):
+        """
+        The main game loop, as a generator which yields each time a frame has been drawn. Playing again
+        starts a new game inside the same loop, so the generator only finishes when the user quits.
+        Param isPlayingAgain: True if the window is already open from a previous game.
+
+        Each frame yields the game time it shows, in seconds: TICK_TIME for every move made so far plus
+        how far through the next move it is. Skipped moves don't count, so the time doesn't jump when
+        the game falls behind.
+
+        A move is made every TICK_TIME seconds of real time, however long drawing takes. If a frame
+        takes longer than that, the moves which are due are made one after the other before the next
+        frame, and counted in lateMoves. Renderers which can animate the snake are drawn in between
+        moves as often as FRAME_RATE allows, at however far through the move the game really is.
+        """
+        played = 0.0  # game time of the moves made so far
+        while True:
+            self.Init(isPlayingAgain)
+
+            self.running = True
+            lag = self.TICK_TIME  # time the moves are behind the clock, so the first is made straight away
+            last = monotonic()
+            while self.running:
+                # The window can be closed from outside the game, by the user or by a backend which
+                # has run out of scripted keys (see yg.setBackend()).
+                if yg.isWindowClosed():
+                    return
+
+                now = monotonic()
+                lag += now - last
+                last = now
+
+                moves = 0
+                while lag >= self.TICK_TIME and self.running and not yg.isWindowClosed():
+                    if moves == self.MAX_CATCH_UP:
+                        # Too far behind to catch up, e.g. the window was being dragged
+                        skipped = int(lag // self.TICK_TIME)
+                        self.skippedMoves += skipped
+                        lag -= skipped * self.TICK_TIME
+                        break
+                    self.Step()
+                    lag -= self.TICK_TIME
+                    played += self.TICK_TIME
+                    moves += 1
+                if moves > 1:
+                    self.lateMoves += moves - 1
+
+                # Tk only notices the window being closed when input is read, so it may have been
+                # closed by the moves. Nothing can be drawn in it after that.
+                if yg.isWindowClosed():
+                    return
+
+                animating = self.AnimationFrames() > 1
+                if moves > 0:
+                    self.Draw()
+                    yield played
+                elif animating:
+                    self.DrawAnimation(lag / self.TICK_TIME)
+                    yield played + lag
+
+                # Wait for the next move, or the next frame in between moves, taking off the time the
+                # frame took to draw.
+                wait = self.TICK_TIME - lag
+                if animating:
+                    wait = min(wait, 1.0 / self.FRAME_RATE)
+                wait -= monotonic() - last
+                if wait > 0:
+                    sleep(wait)
+
+            if not self.playingAgain:
+                break
+            isPlayingAgain = True
 
         if self.quitting:
             sleep(0.5)
             yg.closeWindow()
 
-snakeGame = Game()
-snakeGame.Main(False)
+    def Main(self, isPlayingAgain):
+        for frame in self.Run(isPlayingAgain):
+            pass
+
+    def CaptureFrames(self, isPlayingAgain = False, scale = 1, fps = 10):
+        """
+        Plays the game like Main, yielding frames so they can be streamed into one of the encoders in
+        capture.py. Only the current frame is held in memory.
+
+        The frames are taken at a fixed rate of game time, so a recording plays at the speed of the
+        game whether the snake is being animated or a menu is open. A frame drawn since the last one
+        was taken is repeated until the next is drawn, and frames drawn in between are left out. Give
+        the encoder the same rate, e.g. writeGIF(delay = 100 // fps) or writeVideo(fps = fps).
+        Param scale: If more than 1, frames are shrunk to 1/scale of the window size.
+        Param fps: frames taken per second of game time.
+        """
+        interval = 1.0 / fps
+        nextTime = None  # game time of the next frame to be taken
+        held = None  # the last frame drawn
+        for time in self.Run(isPlayingAgain):
+            if nextTime == None:
+                nextTime = time
+            while held != None and nextTime < time:
+                yield held
+                nextTime += interval
+            held = yg.grabFrame(scale)
+        if held != None:
+            yield held
+
+if __name__ == "__main__":
+    snakeGame = Game()
+    snakeGame.Main(False)
@@ -38,6 +38,7 @@ setCoords method and mouse and keyboard interaction methods.
 The library provides the following graphical objects:
     Point
     Line
+    Polyline
     Circle
     Oval
     Rectangle
@@ -160,7 +161,18 @@ __version__ = "5.0"
 #     Added ability to set text atttributes.
 #     Added Entry boxes.
 
-import time, os, sys
+import time, os, sys, re
+
+try:  # numpy is optional, it is only needed for Image.getPixelArray and
+      # to speed up Transform.screenCoords
+   import numpy
+except ImportError:
+   numpy = None
+
+try:  # OrderedDict keeps the drawing order in 2.x as well
+   from collections import OrderedDict
+except ImportError:
+   OrderedDict = dict
 
 try:  # import as appropriate for 2.x vs. 3.x
    import tkinter as tk
@@ -182,8 +194,14 @@ BAD_OPTION = "Illegal option value"
 ##########################################################################
 # global variables and funtions
 
-_root = tk.Tk()
-_root.withdraw()
+try:
+    _root = tk.Tk()
+    _root.withdraw()
+except tk.TclError:
+    # No display to open windows on (e.g. a server). The module can still be
+    # imported, but only windows which do not need Tk (see offscreen.py)
+    # can be used.
+    _root = None
 
 _update_lasttime = time.time()
 
@@ -217,21 +235,36 @@ class GraphWin(tk.Canvas):
         self.master.title(title)
         self.pack()
         master.resizable(0,0)
+        self._initState(width, height, autoflush)
+        self.bind("<Button-1>", self._onClick)
+        self.bind_all("<Key>", self._onKey)
+        master.lift()
+        if autoflush: self._flush()
+
+    def _initState(self, width, height, autoflush):
+        # Internal method setting up everything about the window which
+        # is not part of Tk, so windows which do not use Tk can share it
         self.foreground = "black"
-        self.items = []
+        self.items = OrderedDict()  # drawn objects, in the order drawn
+        self.tagged = {}  # tag -> OrderedDict of the drawn objects with it
+        self.stackCount = 0  # objects drawn or raised so far, see raiseItem
         self.mouseX = None
         self.mouseY = None
-        self.bind("<Button-1>", self._onClick)
-        self.bind_all("<Key>", self._onKey)
         self.height = int(height)
         self.width = int(width)
         self.autoflush = autoflush
         self._mouseCallback = None
         self.trans = None
         self.closed = False
-        master.lift()
         self.lastKey = ""
-        if autoflush: _root.update()
+        self.inFrame = False
+        self.flushCount = 0    # flushes done since the current frame began
+        self.frameFlushes = 0  # flushes done by the last finished frame
+        self.batch = None      # Tcl commands waiting to be run, see beginBatch
+        self.batchIds = []     # ids of the items created in the batch
+        self.batchItems = []   # objects drawn with one of those ids
+        self.batchArray = "graphicsBatch%d" % id(self)
+        self.batchNumber = 0
 
     def __repr__(self):
         if self.isClosed():
@@ -256,7 +289,7 @@ class GraphWin(tk.Canvas):
         """Set background color of the window"""
         self.__checkOpen()
         self.config(bg=color)
-        self.__autoflush()
+        self._autoflush()
         
     def setCoords(self, x1, y1, x2, y2):
         """Set coordinates of window to run from (x1,y1) in the
@@ -269,21 +302,222 @@ class GraphWin(tk.Canvas):
 
         if self.closed: return
         self.closed = True
+        self.batch = None
         self.master.destroy()
-        self.__autoflush()
+        self._autoflush()
 
 
     def isClosed(self):
         return self.closed
 
+    def setPosition(self, x, y):
+        """Move the window so its top left corner is at (x,y) on the
+        screen"""
+        self.__checkOpen()
+        self.master.geometry("+%d+%d" % (x, y))
+
+    def canDrawImages(self):
+        """Returns True if Image objects can be drawn in the window"""
+        return True
+
 
     def isOpen(self):
         return not self.closed
 
 
-    def __autoflush(self):
-        if self.autoflush:
-            _root.update()
+    def _autoflush(self):
+        if self.autoflush and self.batch is None:
+            self._flush()
+
+    def _flush(self):
+        self._submitBatch()
+        self.flushCount = self.flushCount + 1
+        _root.update()
+
+    def beginFrame(self):
+        """Start drawing a frame. Until endFrame is called, drawing
+        operations do not update the window."""
+        self.__checkOpen()
+        if self.inFrame: raise GraphicsError("frame already started")
+        self.inFrame = True
+        self.frameAutoflush = self.autoflush
+        self.autoflush = False
+        self.flushCount = 0
+        self.frameBatch = self.batch is None
+        if self.frameBatch:
+            self.beginBatch()
+
+    def endFrame(self):
+        """Finish a frame started with beginFrame, updating the window
+        once for everything drawn during it."""
+        if not self.inFrame: raise GraphicsError("frame not started")
+        self.inFrame = False
+        self.autoflush = self.frameAutoflush
+        if self.frameBatch and self.batch is not None:
+            try:
+                self._submitBatch()
+            finally:
+                self.batch = None
+        if not self.closed:
+            self._flush()
+        self.frameFlushes = self.flushCount
+
+    def beginBatch(self):
+        """Start collecting canvas operations. Until endBatch is called,
+        creating, configuring, moving, raising, lowering and deleting items
+        are saved up and then run together as one Tcl script, instead of
+        calling Tcl once for each of them. Anything which reads from the
+        canvas runs the saved operations first. An error in an operation
+        is not raised until the script runs."""
+        self.__checkOpen()
+        if self.batch is not None: raise GraphicsError("batch already started")
+        self.batch = []
+
+    def endBatch(self):
+        """Run the operations collected since beginBatch"""
+        if self.batch is None: raise GraphicsError("batch not started")
+        try:
+            self._submitBatch()
+        finally:
+            self.batch = None
+        self._autoflush()
+
+    def _submitBatch(self):
+        # Runs the operations collected so far in the current batch, then
+        # gives the items created by them the ids Tk chose. The batch
+        # carries on collecting afterwards.
+        if not self.batch:
+            return
+        commands = self.batch
+        pending = self.batchIds
+        items = self.batchItems
+        self.batch = []
+        self.batchIds = []
+        self.batchItems = []
+        if self.closed:
+            return
+        if pending:
+            # The script's result is the list of new ids. The ids are read
+            # before the array holding them is removed.
+            commands.append("lindex [list [list %s] [array unset %s]] 0"
+                            % (" ".join(str(i) for i in pending),
+                               self.batchArray))
+        values = None
+        try:
+            result = self.tk.eval("\n".join(commands))
+            if pending:
+                values = self.tk.splitlist(result)
+        finally:
+            # Even when an operation fails the ids are given out, or later
+            # operations on the items would use an array which is gone
+            if pending:
+                if values is None:
+                    values = self._failedBatchIds(pending)
+                for itemId, value in zip(pending, values):
+                    itemId.value = int(value)
+                for item in items:
+                    if isinstance(item.id, _BatchedId):
+                        item.id = item.id.value
+
+    def _failedBatchIds(self, pending):
+        # Returns the ids of the items created by a batch which stopped at
+        # an error, and removes the array they were put in. Items after the
+        # error were never created and get id 0, which no canvas item has.
+        values = []
+        for itemId in pending:
+            name = "%s(%d)" % (self.batchArray, itemId.number)
+            if self.tk.getboolean(self.tk.call("info", "exists", name)):
+                values.append(self.tk.call("set", name))
+            else:
+                values.append(0)
+        self.tk.call("array", "unset", self.batchArray)
+        return values
+
+    def _batchCommand(self, words):
+        self.batch.append(" ".join([self._w] + [_tclWord(w) for w in words]))
+
+    # The canvas methods used by the graphics objects, collected into the
+    # batch while there is one.
+
+    def _create(self, itemType, args, kw):
+        if self.batch is None:
+            return tk.Canvas._create(self, itemType, args, kw)
+        args = _flattenArgs(args)
+        cnf = {}
+        if args and isinstance(args[-1], dict):
+            cnf = args[-1]
+            args = args[:-1]
+        self.batchNumber = self.batchNumber + 1
+        itemId = _BatchedId(self.batchArray, self.batchNumber)
+        self.batchIds.append(itemId)
+        self.batch.append("set %s(%d) [%s]" % (
+            self.batchArray, self.batchNumber,
+            " ".join([self._w, "create", itemType] +
+                     [_tclWord(a) for a in args] + _tclOptions(cnf, kw))))
+        return itemId
+
+    def coords(self, tagOrId, *args):
+        if self.batch is None or not args:
+            self._submitBatch()
+            return tk.Canvas.coords(self, tagOrId, *args)
+        self._batchCommand(["coords", tagOrId] + _flattenArgs(args))
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        if self.batch is None or not (isinstance(cnf, dict) or kw):
+            self._submitBatch()
+            return tk.Canvas.itemconfigure(self, tagOrId, cnf, **kw)
+        self.batch.append(" ".join([self._w, "itemconfigure", _tclWord(tagOrId)]
+                                   + _tclOptions(cnf, kw)))
+
+    itemconfig = itemconfigure
+
+    def move(self, *args):
+        if self.batch is None:
+            return tk.Canvas.move(self, *args)
+        self._batchCommand(["move"] + list(args))
+
+    def delete(self, *args):
+        if self.batch is None:
+            return tk.Canvas.delete(self, *args)
+        self._batchCommand(["delete"] + list(args))
+
+    def tag_raise(self, *args):
+        if self.batch is None:
+            return tk.Canvas.tag_raise(self, *args)
+        self._batchCommand(["raise"] + list(args))
+
+    def tag_lower(self, *args):
+        if self.batch is None:
+            return tk.Canvas.tag_lower(self, *args)
+        self._batchCommand(["lower"] + list(args))
+
+    def itemcget(self, tagOrId, option):
+        self._submitBatch()
+        return tk.Canvas.itemcget(self, tagOrId, option)
+
+    def type(self, tagOrId):
+        self._submitBatch()
+        return tk.Canvas.type(self, tagOrId)
+
+    def gettags(self, *args):
+        self._submitBatch()
+        return tk.Canvas.gettags(self, *args)
+
+    def find_all(self):
+        self._submitBatch()
+        return tk.Canvas.find_all(self)
+
+    def find_withtag(self, tagOrId):
+        self._submitBatch()
+        return tk.Canvas.find_withtag(self, tagOrId)
+
+    def bbox(self, *args):
+        self._submitBatch()
+        return tk.Canvas.bbox(self, *args)
+
+    def update(self):
+        self._submitBatch()
+        tk.Canvas.update(self)
 
     
     def plot(self, x, y, color="black"):
@@ -291,18 +525,19 @@ class GraphWin(tk.Canvas):
         self.__checkOpen()
         xs,ys = self.toScreen(x,y)
         self.create_line(xs,ys,xs+1,ys, fill=color)
-        self.__autoflush()
+        self._autoflush()
         
     def plotPixel(self, x, y, color="black"):
         """Set pixel raw (independent of window coordinates) pixel
         (x,y) to color"""
         self.__checkOpen()
         self.create_line(x,y,x+1,y, fill=color)
-        self.__autoflush()
+        self._autoflush()
       
     def flush(self):
         """Update drawing to the window"""
         self.__checkOpen()
+        self._submitBatch()
         self.update_idletasks()
         
     def getMouse(self):
@@ -370,6 +605,19 @@ class GraphWin(tk.Canvas):
         else:
             return x,y
                       
+    def screenCoords(self, coords):
+        """Return a flat list [x0,y0,x1,y1,...] of coordinates converted
+        to screen coordinates all at once, which is much quicker than
+        calling toScreen for each point. coords may also be a numpy
+        array."""
+        trans = self.trans
+        if trans:
+            return trans.screenCoords(coords)
+        elif numpy is not None and isinstance(coords, numpy.ndarray):
+            return coords.tolist()
+        else:
+            return list(coords)
+
     def toWorld(self, x, y):
         trans = self.trans
         if trans:
@@ -387,15 +635,159 @@ class GraphWin(tk.Canvas):
             self._mouseCallback(Point(e.x, e.y))
 
     def addItem(self, item):
-        self.items.append(item)
+        self.items[item] = None
+        self._indexTags(item)
+        self.stackCount = self.stackCount + 1
+        item.stackOrder = self.stackCount
+        if isinstance(item.id, _BatchedId):
+            self.batchItems.append(item)
 
     def delItem(self, item):
-        self.items.remove(item)
+        self.items.pop(item, None)
+        self._unindexTags(item)
+
+    def _indexTags(self, item):
+        for tag in item.getTags():
+            self.tagged.setdefault(tag, OrderedDict())[item] = None
+
+    def _unindexTags(self, item):
+        for tag in item.getTags():
+            tagged = self.tagged.get(tag)
+            if tagged is not None:
+                tagged.pop(item, None)
+                if not tagged:
+                    del self.tagged[tag]
+
+    def raiseItem(self, item):
+        """Raise a drawn object above everything else in the window. An
+        object's stackOrder is bigger than that of every object drawn,
+        raised or lowered before it."""
+        self.tag_raise(item.id)
+        self.stackCount = self.stackCount + 1
+        item.stackOrder = self.stackCount
+        self._autoflush()
+
+    def lowerItem(self, item, belowItem):
+        """Move a drawn object down to just under belowItem. Its
+        stackOrder is updated like raiseItem's, so it is only ordered
+        against the objects it was lowered among."""
+        self.tag_lower(item.id, belowItem.id)
+        self.stackCount = self.stackCount + 1
+        item.stackOrder = self.stackCount
+        self._autoflush()
+
+    def undrawItems(self, items):
+        """Undraw many objects using a single canvas operation. Objects
+        which are not drawn in this window are ignored."""
+        ids = []
+        for item in items:
+            if item.canvas is self:
+                ids.append(item.id)
+                self.delItem(item)
+                item._forget()
+        if ids and not self.closed:
+            self.delete(*ids)
+            self._autoflush()
+
+    def clear(self):
+        """Undraw every object in the window using a single canvas
+        operation"""
+        self.__checkOpen()
+        self.delete("all")
+        for item in self.items:
+            item._forget()
+        self.items = OrderedDict()
+        self.tagged = {}
+        self._autoflush()
+
+    # Tags name groups of objects (see GraphicsObject.setTags). Each of
+    # these methods changes every object with a tag using a single canvas
+    # operation, however many objects there are.
+
+    def findTag(self, tag):
+        """Returns a list of the drawn objects with tag"""
+        return list(self.tagged.get(tag, ()))
+
+    def deleteTag(self, tag):
+        """Undraw every object with tag"""
+        items = self.findTag(tag)
+        if not items:
+            return
+        for item in items:
+            self.delItem(item)
+            item._forget()
+        if not self.closed:
+            self.delete(tag)
+            self._autoflush()
+
+    def configTag(self, tag, **options):
+        """Change options such as fill of every object with tag. Every
+        object with the tag must support the options."""
+        items = self.findTag(tag)
+        if not items:
+            return
+        for item in items:
+            for option, value in options.items():
+                if option in item.config:
+                    item.config[option] = value
+        if not self.closed:
+            self.itemconfig(tag, options)
+            self._autoflush()
+
+    def moveTag(self, tag, dx, dy):
+        """Move every object with tag dx units in x direction and dy units
+        in y direction"""
+        items = self.findTag(tag)
+        if not items:
+            return
+        for item in items:
+            item._move(dx, dy)
+            item.screen = None
+        if not self.closed:
+            if self.trans:
+                dx = dx / self.trans.xscale
+                dy = -dy / self.trans.yscale
+            self.move(tag, dx, dy)
+            self._autoflush()
+
+    def hideTag(self, tag):
+        """Hide every object with tag, without undrawing them"""
+        if tag in self.tagged and not self.closed:
+            self.itemconfig(tag, state="hidden")
+            self._autoflush()
+
+    def showTag(self, tag):
+        """Show every object with tag again after hideTag"""
+        if tag in self.tagged and not self.closed:
+            self.itemconfig(tag, state="normal")
+            self._autoflush()
 
     def redraw(self):
-        for item in self.items[:]:
-            item.undraw()
-            item.draw(self)
+        # Moves every item to where the current coordinates put it. The
+        # points of all the items are converted together, and the items
+        # keep their canvas ids, tags and stacking order.
+        if self.closed:
+            return
+        items = list(self.items)
+        world = []
+        ends = []
+        for item in items:
+            world.extend(item._worldCoords())
+            ends.append(len(world))
+        screen = self.screenCoords(world)
+        start = 0
+        for item, end in zip(items, ends):
+            item.screen = (self.trans, screen[start:end])
+            start = end
+        batching = self.batch is None
+        if batching:
+            self.beginBatch()
+        try:
+            for item in items:
+                item._placeItem(self)
+        finally:
+            if batching:
+                self.endBatch()
         self.update()
         
                       
@@ -420,12 +812,35 @@ class Transform:
         ys = (self.ybase-y) / self.yscale
         return int(xs+0.5),int(ys+0.5)
         
+    def screenCoords(self, coords):
+        # Returns a flat list [x0,y0,x1,y1,...] of world coordinates as a
+        # list of screen coordinates, the same as calling screen on each
+        # pair. Long lists and numpy arrays are done by numpy if it is there.
+        if numpy is not None and (len(coords) >= _NUMPY_COORDS
+                                  or isinstance(coords, numpy.ndarray)):
+            a = numpy.array(coords, float)
+            a[0::2] = (a[0::2]-self.xbase) / self.xscale
+            a[1::2] = (self.ybase-a[1::2]) / self.yscale
+            return (a+0.5).astype(int).tolist()
+        xbase = self.xbase
+        ybase = self.ybase
+        xscale = self.xscale
+        yscale = self.yscale
+        screen = []
+        for i in range(0, len(coords), 2):
+            screen.append(int((coords[i]-xbase) / xscale + 0.5))
+            screen.append(int((ybase-coords[i+1]) / yscale + 0.5))
+        return screen
+
     def world(self,xs,ys):
         # Returns xs,ys in world coordinates
         x = xs*self.xscale + self.xbase
         y = self.ybase - ys*self.yscale
         return x,y
 
+# Lists of coordinates at least this long are transformed with numpy
+_NUMPY_COORDS = 64
+
 
 # Default values for various item configuration options. Only a subset of
 #   keys may be present in the configuration dictionary for a given item
@@ -435,6 +850,8 @@ DEFAULT_CONFIG = {"fill":"",
       "arrow":"none",
       "text":"",
       "justify":"center",
+      "joinstyle":"round",
+      "capstyle":"butt",
                   "font": ("helvetica", 12, "normal")}
 
 class GraphicsObject:
@@ -452,6 +869,10 @@ class GraphicsObject:
         #    drawn shape.
         self.canvas = None
         self.id = None
+        self.stackOrder = 0
+        # (transform, screen coordinates) of the object's points, or None
+        # if they have changed since they were last worked out
+        self.screen = None
 
         # config is the dictionary of configuration options for the widget.
         config = {}
@@ -471,6 +892,23 @@ class GraphicsObject:
         """Set line weight to width"""
         self._reconfig("width", width)
 
+    def setTags(self, *tags):
+        """Set the canvas tags of the object, replacing any it had. A tag
+        names a group of objects which a GraphWin can undraw, move, hide or
+        change all at once, see GraphWin.deleteTag."""
+        canvas = self.canvas
+        if canvas:
+            canvas._unindexTags(self)
+        self.config["tags"] = tuple(tags)
+        if canvas and not canvas.isClosed():
+            canvas._indexTags(self)
+            canvas.itemconfig(self.id, tags=self.config["tags"])
+            canvas._autoflush()
+
+    def getTags(self):
+        """Returns a tuple of the object's tags"""
+        return self.config.get("tags", ())
+
     def draw(self, graphwin):
 
         """Draw the object in graphwin, which should be a GraphWin
@@ -483,8 +921,7 @@ class GraphicsObject:
         self.canvas = graphwin
         self.id = self._draw(graphwin, self.config)
         graphwin.addItem(self)
-        if graphwin.autoflush:
-            _root.update()
+        graphwin._autoflush()
         return self
 
             
@@ -497,8 +934,11 @@ class GraphicsObject:
         if not self.canvas.isClosed():
             self.canvas.delete(self.id)
             self.canvas.delItem(self)
-            if self.canvas.autoflush:
-                _root.update()
+            self.canvas._autoflush()
+        self._forget()
+
+    def _forget(self):
+        # Internal method called once the object's canvas item is gone
         self.canvas = None
         self.id = None
 
@@ -509,6 +949,7 @@ class GraphicsObject:
         direction"""
         
         self._move(dx,dy)
+        self.screen = None
         canvas = self.canvas
         if canvas and not canvas.isClosed():
             trans = canvas.trans
@@ -519,8 +960,7 @@ class GraphicsObject:
                 x = dx
                 y = dy
             self.canvas.move(self.id, x, y)
-            if canvas.autoflush:
-                _root.update()
+            canvas._autoflush()
            
     def _reconfig(self, option, setting):
         # Internal method for changing configuration of the object
@@ -532,8 +972,7 @@ class GraphicsObject:
         options[option] = setting
         if self.canvas and not self.canvas.isClosed():
             self.canvas.itemconfig(self.id, options)
-            if self.canvas.autoflush:
-                _root.update()
+            self.canvas._autoflush()
 
 
     def _draw(self, canvas, options):
@@ -546,6 +985,23 @@ class GraphicsObject:
         """updates internal state of object to move it dx,dy units"""
         pass # must override in subclass
 
+    def _worldCoords(self):
+        """Returns the object's points as a flat list [x0,y0,x1,y1,...]"""
+        return [] # must override in subclass
+
+    def _screenCoords(self, canvas):
+        # Returns the object's points in screen coordinates, converting them
+        # again only if they or the window's coordinates have changed
+        screen = self.screen
+        if screen is None or screen[0] is not canvas.trans:
+            screen = self.screen = (canvas.trans,
+                                    canvas.screenCoords(self._worldCoords()))
+        return screen[1]
+
+    def _placeItem(self, canvas):
+        # Moves the object's canvas item to its points
+        canvas.coords(self.id, *self._screenCoords(canvas))
+
          
 class Point(GraphicsObject):
     def __init__(self, x, y):
@@ -558,8 +1014,15 @@ class Point(GraphicsObject):
         return "Point({}, {})".format(self.x, self.y)
         
     def _draw(self, canvas, options):
-        x,y = canvas.toScreen(self.x,self.y)
+        x,y = self._screenCoords(canvas)
         return canvas.create_rectangle(x,y,x+1,y+1,options)
+
+    def _worldCoords(self):
+        return [self.x, self.y]
+
+    def _placeItem(self, canvas):
+        x,y = self._screenCoords(canvas)
+        canvas.coords(self.id, x,y,x+1,y+1)
         
     def _move(self, dx, dy):
         self.x = self.x + dx
@@ -573,44 +1036,84 @@ class Point(GraphicsObject):
     def getX(self): return self.x
     def getY(self): return self.y
 
+class Coord:
+
+    """A position (x, y) which, unlike a Point, can't be drawn and so is
+    much smaller and quicker to make. Shapes keep their points as Coords,
+    and either can be passed to them."""
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def __repr__(self):
+        return "Coord({}, {})".format(self.x, self.y)
+
+    def move(self, dx, dy):
+        self.x = self.x + dx
+        self.y = self.y + dy
+
+    def clone(self):
+        return Coord(self.x, self.y)
+
+    def getX(self): return self.x
+    def getY(self): return self.y
+
+def _coord(p):
+    # Internal function copying a Point or Coord into a new Coord
+    return Coord(p.x, p.y)
+
 class _BBox(GraphicsObject):
     # Internal base class for objects represented by bounding box
     # (opposite corners) Line segment is a degenerate case.
     
     def __init__(self, p1, p2, options=["outline","width","fill"]):
         GraphicsObject.__init__(self, options)
-        self.p1 = p1.clone()
-        self.p2 = p2.clone()
+        self.p1 = _coord(p1)
+        self.p2 = _coord(p2)
 
     def _move(self, dx, dy):
         self.p1.x = self.p1.x + dx
         self.p1.y = self.p1.y + dy
         self.p2.x = self.p2.x + dx
         self.p2.y = self.p2.y  + dy
+
+    def _worldCoords(self):
+        return [self.p1.x, self.p1.y, self.p2.x, self.p2.y]
                 
-    def getP1(self): return self.p1.clone()
+    def getP1(self): return Point(self.p1.x, self.p1.y)
 
-    def getP2(self): return self.p2.clone()
+    def getP2(self): return Point(self.p2.x, self.p2.y)
     
     def getCenter(self):
         p1 = self.p1
         p2 = self.p2
         return Point((p1.x+p2.x)/2.0, (p1.y+p2.y)/2.0)
 
-    
+    def setPoints(self, p1, p2):
+        """Move the corners of the object to p1 and p2. A drawn object
+        keeps its canvas item, only its coordinates are changed."""
+        self.p1 = _coord(p1)
+        self.p2 = _coord(p2)
+        self.screen = None
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            self._placeItem(canvas)
+            canvas._autoflush()
+
+
 class Rectangle(_BBox):
     
     def __init__(self, p1, p2):
         _BBox.__init__(self, p1, p2)
 
     def __repr__(self):
-        return "Rectangle({}, {})".format(str(self.p1), str(self.p2))
+        return "Rectangle({}, {})".format(str(self.getP1()), str(self.getP2()))
     
     def _draw(self, canvas, options):
-        p1 = self.p1
-        p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
+        x1,y1,x2,y2 = self._screenCoords(canvas)
         return canvas.create_rectangle(x1,y1,x2,y2,options)
         
     def clone(self):
@@ -625,7 +1128,7 @@ class Oval(_BBox):
         _BBox.__init__(self, p1, p2)
 
     def __repr__(self):
-        return "Oval({}, {})".format(str(self.p1), str(self.p2))
+        return "Oval({}, {})".format(str(self.getP1()), str(self.getP2()))
 
         
     def clone(self):
@@ -634,17 +1137,14 @@ class Oval(_BBox):
         return other
    
     def _draw(self, canvas, options):
-        p1 = self.p1
-        p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
+        x1,y1,x2,y2 = self._screenCoords(canvas)
         return canvas.create_oval(x1,y1,x2,y2,options)
     
 class Circle(Oval):
     
     def __init__(self, center, radius):
-        p1 = Point(center.x-radius, center.y-radius)
-        p2 = Point(center.x+radius, center.y+radius)
+        p1 = Coord(center.x-radius, center.y-radius)
+        p2 = Coord(center.x+radius, center.y+radius)
         Oval.__init__(self, p1, p2)
         self.radius = radius
 
@@ -668,7 +1168,7 @@ class Line(_BBox):
         self.setOutline = self.setFill
 
     def __repr__(self):
-        return "Line({}, {})".format(str(self.p1), str(self.p2))
+        return "Line({}, {})".format(str(self.getP1()), str(self.getP2()))
 
     def clone(self):
         other = Line(self.p1, self.p2)
@@ -676,10 +1176,7 @@ class Line(_BBox):
         return other
   
     def _draw(self, canvas, options):
-        p1 = self.p1
-        p2 = self.p2
-        x1,y1 = canvas.toScreen(p1.x,p1.y)
-        x2,y2 = canvas.toScreen(p2.x,p2.y)
+        x1,y1,x2,y2 = self._screenCoords(canvas)
         return canvas.create_line(x1,y1,x2,y2,options)
         
     def setArrow(self, option):
@@ -688,17 +1185,88 @@ class Line(_BBox):
         self._reconfig("arrow", option)
         
 
+class Polyline(GraphicsObject):
+
+    """A line through any number of points, drawn as a single canvas item"""
+
+    def __init__(self, *points):
+        # if points passed as a list, extract it
+        if len(points) == 1 and type(points[0]) == type([]):
+            points = points[0]
+        if len(points) < 2:
+            raise GraphicsError("Polyline needs at least two points")
+        self.points = list(map(_coord, points))
+        GraphicsObject.__init__(self, ["arrow","fill","width","joinstyle","capstyle"])
+        self.setFill(DEFAULT_CONFIG['outline'])
+        self.setOutline = self.setFill
+
+    def __repr__(self):
+        return "Polyline"+str(tuple(self.getPoints()))
+
+    def clone(self):
+        other = Polyline(*self.points)
+        other.config = self.config.copy()
+        return other
+
+    def getPoints(self):
+        return [Point(p.x, p.y) for p in self.points]
+
+    def setPoints(self, points):
+        """Change the points the line goes through. A drawn line keeps its
+        canvas item, only its coordinates are changed."""
+        if len(points) < 2:
+            raise GraphicsError("Polyline needs at least two points")
+        self.points = list(map(_coord, points))
+        self.screen = None
+        canvas = self.canvas
+        if canvas and not canvas.isClosed():
+            self._placeItem(canvas)
+            canvas._autoflush()
+
+    def setArrow(self, option):
+        if not option in ["first","last","both","none"]:
+            raise GraphicsError(BAD_OPTION)
+        self._reconfig("arrow", option)
+
+    def setJoinStyle(self, option):
+        """Set how the line is drawn where two segments meet"""
+        if not option in ["round","bevel","miter"]:
+            raise GraphicsError(BAD_OPTION)
+        self._reconfig("joinstyle", option)
+
+    def setCapStyle(self, option):
+        """Set how the ends of the line are drawn"""
+        if not option in ["butt","projecting","round"]:
+            raise GraphicsError(BAD_OPTION)
+        self._reconfig("capstyle", option)
+
+    def _move(self, dx, dy):
+        for p in self.points:
+            p.move(dx,dy)
+
+    def _worldCoords(self):
+        coords = []
+        for p in self.points:
+            coords.append(p.x)
+            coords.append(p.y)
+        return coords
+
+    def _draw(self, canvas, options):
+        args = list(self._screenCoords(canvas))
+        args.append(options)
+        return canvas.create_line(*args)
+
 class Polygon(GraphicsObject):
     
     def __init__(self, *points):
         # if points passed as a list, extract it
         if len(points) == 1 and type(points[0]) == type([]):
             points = points[0]
-        self.points = list(map(Point.clone, points))
+        self.points = list(map(_coord, points))
         GraphicsObject.__init__(self, ["outline", "width", "fill"])
 
     def __repr__(self):
-        return "Polygon"+str(tuple(p for p in self.points))
+        return "Polygon"+str(tuple(self.getPoints()))
         
     def clone(self):
         other = Polygon(*self.points)
@@ -706,37 +1274,42 @@ class Polygon(GraphicsObject):
         return other
 
     def getPoints(self):
-        return list(map(Point.clone, self.points))
+        return [Point(p.x, p.y) for p in self.points]
 
     def _move(self, dx, dy):
         for p in self.points:
             p.move(dx,dy)
    
-    def _draw(self, canvas, options):
-        args = [canvas]
+    def _worldCoords(self):
+        coords = []
         for p in self.points:
-            x,y = canvas.toScreen(p.x,p.y)
-            args.append(x)
-            args.append(y)
+            coords.append(p.x)
+            coords.append(p.y)
+        return coords
+
+    def _draw(self, canvas, options):
+        args = list(self._screenCoords(canvas))
         args.append(options)
-        return GraphWin.create_polygon(*args) 
+        return canvas.create_polygon(*args)
 
 class Text(GraphicsObject):
     
     def __init__(self, p, text):
         GraphicsObject.__init__(self, ["justify","fill","text","font"])
         self.setText(text)
-        self.anchor = p.clone()
+        self.anchor = _coord(p)
         self.setFill(DEFAULT_CONFIG['outline'])
         self.setOutline = self.setFill
 
     def __repr__(self):
-        return "Text({}, '{}')".format(self.anchor, self.getText())
+        return "Text({}, '{}')".format(self.getAnchor(), self.getText())
     
     def _draw(self, canvas, options):
-        p = self.anchor
-        x,y = canvas.toScreen(p.x,p.y)
+        x,y = self._screenCoords(canvas)
         return canvas.create_text(x,y,options)
+
+    def _worldCoords(self):
+        return [self.anchor.x, self.anchor.y]
         
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
@@ -753,7 +1326,7 @@ class Text(GraphicsObject):
         return self.config["text"]
             
     def getAnchor(self):
-        return self.anchor.clone()
+        return Point(self.anchor.x, self.anchor.y)
 
     def setFace(self, face):
         if face in ['helvetica','arial','courier','times roman']:
@@ -784,7 +1357,7 @@ class Entry(GraphicsObject):
 
     def __init__(self, p, width):
         GraphicsObject.__init__(self, [])
-        self.anchor = p.clone()
+        self.anchor = _coord(p)
         #print self.anchor
         self.width = width
         self.text = tk.StringVar(_root)
@@ -795,11 +1368,10 @@ class Entry(GraphicsObject):
         self.entry = None
 
     def __repr__(self):
-        return "Entry({}, {})".format(self.anchor, self.width)
+        return "Entry({}, {})".format(self.getAnchor(), self.width)
 
     def _draw(self, canvas, options):
-        p = self.anchor
-        x,y = canvas.toScreen(p.x,p.y)
+        x,y = self._screenCoords(canvas)
         frm = tk.Frame(canvas.master)
         self.entry = tk.Entry(frm,
                               width=self.width,
@@ -812,6 +1384,9 @@ class Entry(GraphicsObject):
         self.entry.focus_set()
         return canvas.create_window(x,y,window=frm)
 
+    def _worldCoords(self):
+        return [self.anchor.x, self.anchor.y]
+
     def getText(self):
         return self.text.get()
 
@@ -819,7 +1394,7 @@ class Entry(GraphicsObject):
         self.anchor.move(dx,dy)
 
     def getAnchor(self):
-        return self.anchor.clone()
+        return Point(self.anchor.x, self.anchor.y)
 
     def clone(self):
         other = Entry(self.anchor, self.width)
@@ -878,39 +1453,41 @@ class Image(GraphicsObject):
     
     def __init__(self, p, *pixmap):
         GraphicsObject.__init__(self, [])
-        self.anchor = p.clone()
+        self.anchor = _coord(p)
         self.imageId = Image.idCount
         Image.idCount = Image.idCount + 1
-        if len(pixmap) == 1: # file name provided
+        if len(pixmap) == 1 and isinstance(pixmap[0], tk.PhotoImage):
+            # photoimage already loaded, which is shared rather than copied
+            self.img = pixmap[0]
+        elif len(pixmap) == 1: # file name provided
             self.img = tk.PhotoImage(file=pixmap[0], master=_root)
         else: # width and height provided
             width, height = pixmap
             self.img = tk.PhotoImage(master=_root, width=width, height=height)
 
     def __repr__(self):
-        return "Image({}, {}, {})".format(self.anchor, self.getWidth(), self.getHeight())
+        return "Image({}, {}, {})".format(self.getAnchor(), self.getWidth(), self.getHeight())
                 
     def _draw(self, canvas, options):
-        p = self.anchor
-        x,y = canvas.toScreen(p.x,p.y)
+        x,y = self._screenCoords(canvas)
         self.imageCache[self.imageId] = self.img # save a reference  
-        return canvas.create_image(x,y,image=self.img)
+        return canvas.create_image(x,y,options,image=self.img)
+
+    def _worldCoords(self):
+        return [self.anchor.x, self.anchor.y]
     
     def _move(self, dx, dy):
         self.anchor.move(dx,dy)
         
-    def undraw(self):
-        try:
-            del self.imageCache[self.imageId]  # allow gc of tk photoimage
-        except KeyError:
-            pass
-        GraphicsObject.undraw(self)
+    def _forget(self):
+        self.imageCache.pop(self.imageId, None)  # allow gc of tk photoimage
+        GraphicsObject._forget(self)
 
     def getAnchor(self):
-        return self.anchor.clone()
+        return Point(self.anchor.x, self.anchor.y)
         
     def clone(self):
-        other = Image(Point(0,0), 0, 0)
+        other = Image(Coord(0,0), 0, 0)
         other.img = self.img.copy()
         other.anchor = self.anchor.clone()
         other.config = self.config.copy()
@@ -943,6 +1520,82 @@ class Image(GraphicsObject):
         
         """
         self.img.put("{" + color +"}", (x, y))
+
+    def fillRect(self, x, y, width, height, color):
+        """Sets every pixel in the width x height rectangle with its top
+        left corner at (x,y) to the given color, using a single put
+
+        """
+        self.img.put("{" + color +"}", (x, y, x+width, y+height))
+
+    def getPixels(self, x=0, y=0, width=None, height=None):
+        """Returns the colors of a rectangle of the image as a bytearray
+        holding r,g,b for each pixel, row by row. The rectangle defaults
+        to the rest of the image from (x,y). The rectangle is read with a
+        single call, which is much faster than getPixel for each pixel.
+
+        """
+        x, y, width, height = self._region(x, y, width, height)
+        return _photoPixels(self.img, x, y, width, height)
+
+    def getPixelArray(self, x=0, y=0, width=None, height=None):
+        """Returns the colors of a rectangle of the image as a numpy
+        array of shape (height, width, 3). Needs numpy to be installed.
+
+        """
+        if numpy is None:
+            raise GraphicsError("getPixelArray needs numpy")
+        x, y, width, height = self._region(x, y, width, height)
+        data = self.getPixels(x, y, width, height)
+        return numpy.frombuffer(data, numpy.uint8).reshape(height, width, 3)
+
+    def setPixels(self, data, x=0, y=0, width=None, height=None):
+        """Sets the colors of a rectangle of the image with its top left
+        corner at (x,y) from data, which holds r,g,b for each pixel row by
+        row, like the result of getPixels. data may also be a numpy array
+        of shape (height, width, 3), which sets the size of the rectangle.
+        The rectangle is written with a single call.
+
+        """
+        if numpy is not None and isinstance(data, numpy.ndarray):
+            height, width = data.shape[:2]
+            data = data.astype(numpy.uint8).tobytes()
+        x, y, width, height = self._region(x, y, width, height)
+        if len(data) != width*height*3:
+            raise GraphicsError("pixel data does not match rectangle size")
+        ppm = ("P6 %d %d 255\n" % (width, height)).encode("ascii") + bytes(data)
+        self.img.tk.call(self.img, "put", ppm, "-format", "ppm",
+                         "-to", x, y)
+
+    def blit(self, atlas, name, x=0, y=0):
+        """Copies the region called name of an Atlas into this image
+        with its top left corner at (x,y). Transparent pixels of the
+        region leave the image as it was. The copy is a single call and
+        makes no new images.
+
+        """
+        left, top, width, height = atlas.getRegion(name)
+        self.img.tk.call(self.img, "copy", atlas.img,
+                         "-from", left, top, left+width, top+height,
+                         "-to", x, y)
+
+    @classmethod
+    def fromRGB(cls, p, width, height, data):
+        """Returns a new Image anchored at p, made from data holding r,g,b
+        for each pixel row by row (see setPixels).
+
+        """
+        image = cls(p, width, height)
+        image.setPixels(data, 0, 0, width, height)
+        return image
+
+    def _region(self, x, y, width, height):
+        # Internal method filling in the default size of a rectangle
+        if width is None:
+            width = self.getWidth() - x
+        if height is None:
+            height = self.getHeight() - y
+        return x, y, width, height
         
 
     def save(self, filename):
@@ -955,7 +1608,118 @@ class Image(GraphicsObject):
         ext = name.split(".")[-1]
         self.img.write( filename, format=ext)
 
+
+
+class Atlas:
+
+    """Many small images kept in one image file, each a named rectangle
+    of it. The file is only read once, and the regions are copied into
+    an Image with Image.blit."""
+
+    def __init__(self, image, regions):
+        """image is the file name of the atlas or an already loaded tk
+        PhotoImage, regions a dictionary mapping each name to the
+        (x, y, width, height) of its rectangle in the image"""
+        if isinstance(image, tk.PhotoImage):
+            self.img = image
+        else:
+            self.img = tk.PhotoImage(file=image, master=_root)
+        self.regions = dict(regions)
+
+    def __repr__(self):
+        return "Atlas({}, {})".format(self.img, sorted(self.regions))
+
+    def getRegion(self, name):
+        """Returns the (x, y, width, height) of the region called name"""
+        try:
+            return self.regions[name]
+        except KeyError:
+            raise GraphicsError("no region called " + str(name))
+
+    def getNames(self):
+        """Returns a list of the names of the regions"""
+        return list(self.regions)
+
         
+def _photoPixels(img, x, y, width, height):
+    # Returns the colors of a rectangle of a tk PhotoImage (or the name
+    # of one) as a bytearray of r,g,b for each pixel, row by row
+    data = _root.tk.call(img, "data", "-from", x, y, x+width, y+height)
+    # data is a list of rows of #rrggbb colors
+    hexdata = _root.tk.call("string", "map", ("#", "", "{", "", "}", ""), data)
+    return bytearray.fromhex(str(hexdata))
+
+class _BatchedId:
+
+    """Internal id of an item created during a batch (see
+    GraphWin.beginBatch). Until the batch runs it stands for the Tcl
+    variable the real id will be put in, afterwards for the real id."""
+
+    def __init__(self, array, number):
+        self.word = "$%s(%d)" % (array, number)
+        self.number = number
+        self.value = None
+
+    def __str__(self):
+        if self.value is None:
+            return self.word
+        return str(self.value)
+
+    __repr__ = __str__
+
+_TCL_SPECIAL = re.compile(r'[\s"\\$\[\]{};]')
+_TCL_ESCAPES = {"\n": "\\n", "\t": "\\t", "\r": "\\r"}
+
+def _tclWord(value):
+    # Quotes a value as a single word of a Tcl command. Tuples and lists
+    # become Tcl lists.
+    if isinstance(value, _BatchedId):
+        return str(value)
+    if isinstance(value, (tuple, list)):
+        return "{" + " ".join(_tclWord(v) for v in value) + "}"
+    value = str(value)
+    if value == "":
+        return "{}"
+    return _TCL_SPECIAL.sub(
+        lambda m: _TCL_ESCAPES.get(m.group(), "\\" + m.group()), value)
+
+def _tclOptions(cnf, kw):
+    # Returns the words for Tk options, like tkinter's _options
+    words = []
+    for option, value in _mergeOptions(cnf, kw).items():
+        words.append("-" + option)
+        words.append(_tclWord(value))
+    return words
+
+def _mergeOptions(cnf, kw):
+    # Merges tkinter style options into one dictionary, leaving out those
+    # which are None and taking the "_" off the end of names like "class_".
+    # Also used by the offscreen canvas.
+    options = {}
+    if cnf:
+        options.update(cnf)
+    if kw:
+        options.update(kw)
+    result = {}
+    for option, value in options.items():
+        if value is None:
+            continue
+        if option[-1] == "_":
+            option = option[:-1]
+        result[option] = value
+    return result
+
+def _flattenArgs(args):
+    # Flattens nested tuples and lists of coordinates, like tkinter does.
+    # Also used by the offscreen canvas.
+    flat = []
+    for arg in args:
+        if isinstance(arg, (tuple, list)):
+            flat.extend(_flattenArgs(arg))
+        else:
+            flat.append(arg)
+    return flat
+
 def color_rgb(r,g,b):
     """r,g,b are intensities of red, green, and blue in range(256)
     Returns color specifier string for the resulting color"""
@@ -1009,7 +1773,8 @@ def test():
 #tk.Toplevel(_root).destroy()
 
 # MacOS fix 1
-update()
+if _root:
+    update()
 
 if __name__ == "__main__":
     test()
\ No newline at end of file
@@ -2,7 +2,7 @@ import graphics as g
 import york_graphics as yg
       
 class Text(object):
-    def __init__(self, string, x, y, size, colour):
+    def __init__(self, string, x, y, size, colour, key = None):
         """
         param string: the text to be displayed.
         param x: the x position of the string at the center.
@@ -10,12 +10,15 @@ class Text(object):
         param size: the size of the displayed text.
         param colour: the colour of the displayed colour. The format of the string
                       is found using the york_graphics getRgbColour() function.
+        param key: if given, the text is drawn as a retained shape with this key, so it stays
+                   on the canvas and drawing it again only changes what is different.
         """
         self.string = string
         self.x = x
         self.y = y
         self.size = size
         self.colour = colour
+        self.key = key
 
     def SetString(self, string):
         self.string = string
@@ -40,7 +43,7 @@ class Text(object):
         yg.moveTo(self.x, self.y)
         yg.setLineColour(self.colour)
         yg.setTextProperties(size = self.size)
-        yg.drawText(self.string)     
+        yg.drawText(self.string, self.key)
 
     def _DrawBox(self):
         yg.moveTo(self.x, self.y + (self.height / 2))
@@ -56,6 +59,10 @@ class Text(object):
 class Button(object):
     """
     A clickable, hoverable, button.
+
+    The background and caption are retained shapes, so they are only created the first time the
+    button is drawn. After that, drawing only changes the background colour when the button has
+    been hovered or unhovered. The game removes them when the menu changes.
     """
     MAIN_MENU_BTN_WIDTH  = 300
     MAIN_MENU_BTN_HEIGHT = 50
@@ -82,7 +89,7 @@ class Button(object):
         self.textColour      = textColour
         self.function        = function
 
-        self.text = Text(text, self.x + (self.width // 2), self.y + (self.height // 2), 14, self.textColour)
+        self.text = Text(text, self.x + (self.width // 2), self.y + (self.height // 2), 14, self.textColour, (self, "text"))
 
         self.hover = False
 
@@ -118,7 +125,7 @@ class Button(object):
         else:
             yg.setLineColour(self.bgColour)
         yg.setLineThickness(self.height)
-        yg.drawLine(self.width, 0)
+        yg.drawLine(self.width, 0, (self, "box"))
 
 
 
@@ -319,8 +326,8 @@ class SaveScoreMenu(Menu):
     def __init__(self, screenWidth, saveBtnFunc):
         Menu.__init__(self)
 
-        self.entryLabelText = Text("Enter Username: ", (screenWidth / 2) - ((Button.MAIN_MENU_BTN_WIDTH / 2) - 90), 250 + 25, 14, Button.TEXT_COLOUR)
-        self.entryEntryText = Text("", (screenWidth / 2) - ((Button.MAIN_MENU_BTN_WIDTH / 2) - 200), 250 + 25, 14, Button.TEXT_COLOUR)
+        self.entryLabelText = Text("Enter Username: ", (screenWidth / 2) - ((Button.MAIN_MENU_BTN_WIDTH / 2) - 90), 250 + 25, 14, Button.TEXT_COLOUR, (self, "label"))
+        self.entryEntryText = Text("", (screenWidth / 2) - ((Button.MAIN_MENU_BTN_WIDTH / 2) - 200), 250 + 25, 14, Button.TEXT_COLOUR, (self, "entry"))
         self.entry = TextEntry(screenWidth, self.entryLabelText, self.entryEntryText, 3)
 
         self.saveScoreBtn = Button((screenWidth / 2) - (Button.MAIN_MENU_BTN_WIDTH / 2), 350,
@@ -0,0 +1,768 @@
+# offscreen.py
+"""Windows which draw without a display
+
+OffscreenWin is a GraphWin which keeps its canvas items in memory
+instead of showing them on the screen. It does not need Tk or a display,
+so it can be used on a server. Anything drawn into it, with graphics
+objects or through york_graphics, can be rasterised into an RGB buffer
+and saved as a PPM or PNG file:
+
+--------------------------------------------------------------------
+from graphics import *
+from offscreen import OffscreenWin
+
+win = OffscreenWin("Frame", 200, 100)
+line = Line(Point(10, 50), Point(190, 50))
+line.setWidth(10)
+line.draw(win)
+win.save("frame.png")
+--------------------------------------------------------------------
+
+NullWin goes further and keeps nothing at all, so a program can be run
+with its drawing costing next to nothing, e.g. to time everything else.
+
+Only the parts of the Tk canvas used by the graphics module are
+emulated. Text is drawn with a small built in bitmap font, so it does
+not look like text in a real window. Images can only be drawn if Tk is
+available to read their pixels from."""
+
+import math, struct, zlib
+
+import graphics
+
+try:
+   from collections import OrderedDict
+except ImportError:
+   OrderedDict = dict
+
+# Background of a Tk canvas which has not had setBackground called on it
+DEFAULT_BACKGROUND = "#d9d9d9"
+
+##########################################################################
+# Offscreen window
+
+class _CanvasItem:
+
+    """Internal record of an item on an OffscreenWin canvas"""
+
+    def __init__(self, itemType, coords, options):
+        self.type = itemType
+        self.coords = coords
+        self.options = {}
+        self.tags = ()
+        self.configure(options)
+
+    def configure(self, options):
+        for option, value in options.items():
+            if option == "tags":
+                if isinstance(value, str):
+                    value = value.split()
+                self.tags = tuple(value)
+            else:
+                self.options[option] = value
+
+
+class OffscreenWin(graphics.GraphWin):
+
+    """An OffscreenWin is a GraphWin which draws into memory rather
+    than onto the screen."""
+
+    def __init__(self, title="Graphics Window",
+                 width=200, height=200, autoflush=True, keys=None):
+        # keys is an optional list of key presses. Each call to checkKey
+        # returns the next one, "" meaning no key was pressed.
+        self.title = title
+        self._initState(width, height, autoflush)
+        self.background = DEFAULT_BACKGROUND
+        self.canvasItems = OrderedDict()  # id -> _CanvasItem, bottom first, see _stacked
+        # The stacking order as a linked list of ids, from 0 at the bottom
+        # to -1 at the top, so restacking an item doesn't touch the others
+        self.above = {0: -1}
+        self.below = {-1: 0}
+        self.restacked = False  # canvasItems is not in stacking order
+        self.nextId = 1
+        if keys is None:
+            self.keyScript = None
+        else:
+            self.keyScript = iter(keys)
+
+    def __repr__(self):
+        if self.isClosed():
+            return "<Closed OffscreenWin>"
+        else:
+            return "OffscreenWin('{}', {}, {})".format(self.title,
+                                                      self.getWidth(),
+                                                      self.getHeight())
+
+    def close(self):
+        """Close the window"""
+        self.closed = True
+
+    def setPosition(self, x, y):
+        pass
+
+    def canDrawImages(self):
+        return graphics._root is not None
+
+    def _flush(self):
+        self.flushCount = self.flushCount + 1
+
+    def update(self):
+        if self.keyScript is not None and self.lastKey == "":
+            self.lastKey = next(self.keyScript, "")
+
+    def update_idletasks(self):
+        pass
+
+    def getMouse(self):
+        raise graphics.GraphicsError("getMouse in offscreen window")
+
+    def configure(self, cnf=None, **kw):
+        options = graphics._mergeOptions(cnf, kw)
+        for option in ("bg", "background"):
+            if option in options:
+                self.background = options[option]
+
+    config = configure
+
+    def getPixels(self):
+        """Returns the window's contents as a bytearray of r,g,b for each
+        pixel, row by row"""
+        return rasterise(self.width, self.height, self.background,
+                         self._stacked().values())
+
+    def save(self, filename, scale=1):
+        """Saves the window's contents to filename, as a PNG or PPM
+        depending on the filename extension. If scale is more than 1, the
+        image is shrunk to 1/scale of the window's size."""
+        data = self.getPixels()
+        width, height = self.width, self.height
+        if scale > 1:
+            data, width, height = shrink(data, width, height, scale)
+        if filename.lower().endswith(".png"):
+            writePNG(filename, width, height, data)
+        else:
+            writePPM(filename, width, height, data)
+
+    # The rest of the class emulates the Tk canvas methods used by the
+    # graphics module.
+
+    def _create(self, itemType, args, kw):
+        args = graphics._flattenArgs(args)
+        cnf = {}
+        if args and isinstance(args[-1], dict):
+            cnf = args[-1]
+            args = args[:-1]
+        itemId = self.nextId
+        self.nextId = self.nextId + 1
+        self.canvasItems[itemId] = _CanvasItem(itemType,
+                                               [float(c) for c in args],
+                                               graphics._mergeOptions(cnf, kw))
+        self._link(itemId, self.below[-1])
+        return itemId
+
+    def _link(self, itemId, belowId):
+        # Puts an item in the stacking order just above belowId
+        aboveId = self.above[belowId]
+        self.above[belowId] = itemId
+        self.below[itemId] = belowId
+        self.above[itemId] = aboveId
+        self.below[aboveId] = itemId
+
+    def _unlink(self, itemId):
+        # Takes an item out of the stacking order
+        belowId = self.below.pop(itemId)
+        aboveId = self.above.pop(itemId)
+        self.above[belowId] = aboveId
+        self.below[aboveId] = belowId
+
+    def _stacked(self):
+        # Returns canvasItems, putting it back in stacking order first if
+        # items have been restacked since it last was. Restacking only
+        # changes the linked list, so however many items are restacked in a
+        # frame the items are only put in order once, when they are next
+        # looked at in order.
+        if self.restacked:
+            items = self.canvasItems
+            order = OrderedDict()
+            itemId = self.above[0]
+            while itemId != -1:
+                order[itemId] = items[itemId]
+                itemId = self.above[itemId]
+            self.canvasItems = order
+            self.restacked = False
+        return self.canvasItems
+
+    def _find(self, tagOrId):
+        # Returns the ids of the items matching tagOrId, bottom first
+        if isinstance(tagOrId, int) or (isinstance(tagOrId, str)
+                                        and tagOrId.isdigit()):
+            itemId = int(tagOrId)
+            if itemId in self.canvasItems:
+                return [itemId]
+            return []
+        if tagOrId == "all":
+            return list(self._stacked())
+        return [itemId for itemId, item in self._stacked().items()
+                if tagOrId in item.tags]
+
+    def coords(self, tagOrId, *args):
+        ids = self._find(tagOrId)
+        if not ids:
+            return []
+        item = self.canvasItems[ids[0]]
+        if args:
+            item.coords = [float(c) for c in graphics._flattenArgs(args)]
+        else:
+            return list(item.coords)
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        options = graphics._mergeOptions(cnf, kw)
+        for itemId in self._find(tagOrId):
+            self.canvasItems[itemId].configure(options)
+
+    itemconfig = itemconfigure
+
+    def itemcget(self, tagOrId, option):
+        for itemId in self._find(tagOrId):
+            return self.canvasItems[itemId].options.get(option, "")
+        return ""
+
+    def type(self, tagOrId):
+        for itemId in self._find(tagOrId):
+            return self.canvasItems[itemId].type
+        return None
+
+    def gettags(self, tagOrId):
+        for itemId in self._find(tagOrId):
+            return self.canvasItems[itemId].tags
+        return ()
+
+    def find_all(self):
+        return tuple(self._stacked())
+
+    def find_withtag(self, tagOrId):
+        return tuple(self._find(tagOrId))
+
+    def delete(self, *args):
+        for tagOrId in args:
+            for itemId in self._find(tagOrId):
+                del self.canvasItems[itemId]
+                self._unlink(itemId)
+
+    def move(self, tagOrId, dx, dy):
+        for itemId in self._find(tagOrId):
+            item = self.canvasItems[itemId]
+            coords = item.coords
+            for i in range(0, len(coords) - 1, 2):
+                coords[i] = coords[i] + dx
+                coords[i+1] = coords[i+1] + dy
+
+    def tag_raise(self, tagOrId, aboveThis=None):
+        if aboveThis is None:
+            self._restack(tagOrId, None, True)
+        else:
+            ids = self._find(aboveThis)
+            if ids:
+                self._restack(tagOrId, ids[-1], True)
+
+    def tag_lower(self, tagOrId, belowThis=None):
+        if belowThis is None:
+            self._restack(tagOrId, None, False)
+        else:
+            ids = self._find(belowThis)
+            if ids:
+                self._restack(tagOrId, ids[0], False)
+
+    def _restack(self, tagOrId, reference, above):
+        # Moves the matching items next to reference, or to the very top
+        # or bottom if there is no reference
+        moving = self._find(tagOrId)
+        if not moving or reference in moving:
+            return
+        for itemId in moving:
+            self._unlink(itemId)
+        if reference is None:
+            belowId = self.below[-1] if above else 0
+        else:
+            belowId = reference if above else self.below[reference]
+        for itemId in moving:
+            self._link(itemId, belowId)
+            belowId = itemId
+        self.restacked = True
+
+
+class NullWin(OffscreenWin):
+
+    """A NullWin is a GraphWin which draws nothing. Graphics objects can
+    be drawn into it as usual, but it keeps no canvas items, so drawing
+    costs no more than the graphics objects themselves. If it is given
+    keys, it closes itself at the end of the frame after the last one
+    has been returned."""
+
+    def __init__(self, title="Graphics Window",
+                 width=200, height=200, autoflush=True, keys=None):
+        OffscreenWin.__init__(self, title, width, height, autoflush, keys)
+        self.keysDone = False
+
+    def __repr__(self):
+        if self.isClosed():
+            return "<Closed NullWin>"
+        else:
+            return "NullWin('{}', {}, {})".format(self.title,
+                                                 self.getWidth(),
+                                                 self.getHeight())
+
+    def canDrawImages(self):
+        return False
+
+    def _flush(self):
+        self.flushCount = self.flushCount + 1
+        if self.keysDone:
+            self.close()
+
+    def update(self):
+        if self.keyScript is not None and self.lastKey == "":
+            key = next(self.keyScript, None)
+            if key is None:
+                self.keysDone = True
+                key = ""
+            self.lastKey = key
+
+    def getPixels(self):
+        return rasterise(self.width, self.height, self.background, ())
+
+    # Canvas methods which do nothing
+
+    def _create(self, itemType, args, kw):
+        itemId = self.nextId
+        self.nextId = self.nextId + 1
+        return itemId
+
+    def coords(self, tagOrId, *args):
+        if not args:
+            return []
+
+    def itemconfigure(self, tagOrId, cnf=None, **kw):
+        pass
+
+    itemconfig = itemconfigure
+
+    def delete(self, *args):
+        pass
+
+    def move(self, tagOrId, dx, dy):
+        pass
+
+    def tag_raise(self, tagOrId, aboveThis=None):
+        pass
+
+    def tag_lower(self, tagOrId, belowThis=None):
+        pass
+
+
+##########################################################################
+# Rasterising
+
+def rasterise(width, height, background, items):
+    """Returns a bytearray of r,g,b for each pixel, row by row, with the
+    canvas items drawn onto the background color, first item at the
+    bottom. items are objects with type, coords and options attributes
+    like OffscreenWin.canvasItems."""
+    raster = _Raster(width, height, background)
+    for item in items:
+        options = item.options
+        if options.get("state") == "hidden":
+            continue
+        draw = _DRAW_ITEM.get(item.type)
+        if draw:
+            draw(raster, item.coords, options)
+    return raster.data
+
+
+# Options of each item type which rasterise looks at
+_ITEM_OPTIONS = {"line": ("fill", "width", "capstyle"),
+                 "rectangle": ("fill", "outline", "width"),
+                 "oval": ("fill", "outline", "width"),
+                 "polygon": ("fill", "outline", "width"),
+                 "text": ("text", "font", "fill", "anchor", "justify"),
+                 "image": ("image", "anchor")}
+
+def snapshot(canvas):
+    """Returns the items on a Tk canvas, such as a GraphWin, as a list of
+    records which can be given to rasterise. Every item has to be read
+    back from Tk, so this is much slower than drawing offscreen."""
+    items = []
+    for itemId in canvas.find_all():
+        itemType = canvas.type(itemId)
+        if itemType not in _ITEM_OPTIONS:
+            continue
+        options = {"state": canvas.itemcget(itemId, "state")}
+        for option in _ITEM_OPTIONS[itemType]:
+            options[option] = canvas.itemcget(itemId, option)
+        if itemType == "text":
+            options["font"] = canvas.tk.splitlist(options["font"])
+        items.append(_CanvasItem(itemType, canvas.coords(itemId), options))
+    return items
+
+
+def _px(value):
+    # Rounds a coordinate to the nearest pixel boundary
+    return int(math.floor(value + 0.5))
+
+
+class _Raster:
+
+    """Internal RGB buffer with the drawing primitives used by rasterise"""
+
+    def __init__(self, width, height, background):
+        self.width = width
+        self.height = height
+        self.data = bytearray(_rgb(background) * (width * height))
+
+    def fillRect(self, x1, y1, x2, y2, rgb):
+        # Fills the pixels from (x1,y1) up to but not including (x2,y2)
+        x1 = max(0, _px(x1))
+        y1 = max(0, _px(y1))
+        x2 = min(self.width, _px(x2))
+        y2 = min(self.height, _px(y2))
+        if x1 >= x2 or y1 >= y2:
+            return
+        row = rgb * (x2 - x1)
+        stride = self.width * 3
+        data = self.data
+        offset = y1 * stride + x1 * 3
+        for y in range(y1, y2):
+            data[offset:offset + len(row)] = row
+            offset = offset + stride
+
+    def blit(self, x, y, width, height, pixels):
+        # Copies a width x height block of r,g,b pixels to (x,y)
+        x = _px(x)
+        y = _px(y)
+        left = max(0, -x)
+        right = min(width, self.width - x)
+        if left >= right:
+            return
+        stride = self.width * 3
+        for row in range(max(0, -y), min(height, self.height - y)):
+            source = (row * width + left) * 3
+            offset = (y + row) * stride + (x + left) * 3
+            self.data[offset:offset + (right - left) * 3] = \
+                pixels[source:source + (right - left) * 3]
+
+
+def _drawLine(raster, coords, options):
+    color = options.get("fill", "black")
+    if not color or len(coords) < 4:
+        return
+    rgb = _rgb(color)
+    half = max(1.0, float(options.get("width", 1))) / 2.0
+    cap = half if options.get("capstyle") == "projecting" else 0.0
+    points = list(zip(coords[0::2], coords[1::2]))
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        if y1 == y2:
+            raster.fillRect(min(x1, x2) - cap, y1 - half,
+                            max(x1, x2) + cap, y1 + half, rgb)
+        elif x1 == x2:
+            raster.fillRect(x1 - half, min(y1, y2) - cap,
+                            x1 + half, max(y1, y2) + cap, rgb)
+        else:
+            # Stamp a square the width of the line along it
+            steps = int(max(abs(x2 - x1), abs(y2 - y1))) + 1
+            for step in range(steps + 1):
+                x = x1 + (x2 - x1) * step / float(steps)
+                y = y1 + (y2 - y1) * step / float(steps)
+                raster.fillRect(x - half, y - half, x + half, y + half, rgb)
+    # Fill in the corners where the segments join. Like Tk, a line which
+    # turns straight back on itself is left flat at the turn.
+    for (x0, y0), (x, y), (x2, y2) in zip(points, points[1:], points[2:]):
+        cross = (x - x0) * (y2 - y) - (y - y0) * (x2 - x)
+        dot = (x - x0) * (x2 - x) + (y - y0) * (y2 - y)
+        if cross != 0 or dot >= 0:
+            raster.fillRect(x - half, y - half, x + half, y + half, rgb)
+
+
+def _drawRectangle(raster, coords, options):
+    x1, x2 = sorted(coords[0::2][:2])
+    y1, y2 = sorted(coords[1::2][:2])
+    fill = options.get("fill", "")
+    if fill:
+        raster.fillRect(x1, y1, x2, y2, _rgb(fill))
+    outline = options.get("outline", "black")
+    if outline:
+        rgb = _rgb(outline)
+        w = max(1.0, float(options.get("width", 1)))
+        raster.fillRect(x1, y1, x2, y1 + w, rgb)
+        raster.fillRect(x1, y2 - w, x2, y2, rgb)
+        raster.fillRect(x1, y1, x1 + w, y2, rgb)
+        raster.fillRect(x2 - w, y1, x2, y2, rgb)
+
+
+def _ovalSpan(cx, cy, rx, ry, y):
+    # Returns the half width of an oval on the pixel row y, or None if
+    # the row is outside it
+    if rx <= 0 or ry <= 0:
+        return None
+    t = (y + 0.5 - cy) / ry
+    if abs(t) >= 1:
+        return None
+    return rx * math.sqrt(1 - t * t)
+
+
+def _drawOval(raster, coords, options):
+    x1, x2 = sorted(coords[0::2][:2])
+    y1, y2 = sorted(coords[1::2][:2])
+    cx, cy = (x1 + x2) / 2.0, (y1 + y2) / 2.0
+    rx, ry = (x2 - x1) / 2.0, (y2 - y1) / 2.0
+    fill = options.get("fill", "")
+    outline = options.get("outline", "black")
+    w = max(1.0, float(options.get("width", 1)))
+    for y in range(max(0, _px(y1)), min(raster.height, _px(y2))):
+        outer = _ovalSpan(cx, cy, rx, ry, y)
+        if outer is None:
+            continue
+        inner = _ovalSpan(cx, cy, rx - w, ry - w, y)
+        if fill:
+            raster.fillRect(cx - outer, y, cx + outer, y + 1, _rgb(fill))
+        if outline:
+            rgb = _rgb(outline)
+            if inner is None:
+                raster.fillRect(cx - outer, y, cx + outer, y + 1, rgb)
+            else:
+                raster.fillRect(cx - outer, y, cx - inner, y + 1, rgb)
+                raster.fillRect(cx + inner, y, cx + outer, y + 1, rgb)
+
+
+def _drawPolygon(raster, coords, options):
+    points = list(zip(coords[0::2], coords[1::2]))
+    if len(points) < 3:
+        return
+    fill = options.get("fill", "")
+    if fill:
+        rgb = _rgb(fill)
+        ys = [p[1] for p in points]
+        edges = list(zip(points, points[1:] + points[:1]))
+        for y in range(max(0, _px(min(ys))), min(raster.height, _px(max(ys)))):
+            yc = y + 0.5
+            xs = []
+            for (x1, y1), (x2, y2) in edges:
+                if (y1 <= yc) != (y2 <= yc):
+                    xs.append(x1 + (yc - y1) * (x2 - x1) / (y2 - y1))
+            xs.sort()
+            for i in range(0, len(xs) - 1, 2):
+                raster.fillRect(xs[i], y, xs[i+1], y + 1, rgb)
+    outline = options.get("outline", "black")
+    if outline:
+        closed = coords + coords[:2]
+        _drawLine(raster, closed, {"fill": outline,
+                                   "width": options.get("width", 1)})
+
+
+def _anchorOffset(anchor, width, height):
+    # Returns the offset from an anchor point to the top left corner of
+    # a width x height box
+    if anchor == "center":
+        return -width / 2.0, -height / 2.0
+    if "w" in anchor:
+        dx = 0
+    elif "e" in anchor:
+        dx = -width
+    else:
+        dx = -width / 2.0
+    if anchor.startswith("n"):
+        dy = 0
+    elif anchor.startswith("s"):
+        dy = -height
+    else:
+        dy = -height / 2.0
+    return dx, dy
+
+
+def _drawText(raster, coords, options):
+    text = str(options.get("text", "")).replace("\t", "    ")
+    color = options.get("fill", "black")
+    if not text or not color:
+        return
+    rgb = _rgb(color)
+    font = options.get("font", graphics.DEFAULT_CONFIG["font"])
+    if isinstance(font, str):
+        font = font.split()
+    try:
+        size = abs(int(font[1]))
+    except (IndexError, ValueError):
+        size = 12
+    # Tk font sizes are points, roughly 4/3 of a pixel each
+    scale = max(1, _px(size * 4 / 3.0 / 8))
+    lines = text.split("\n")
+    lineWidth = [len(line) * 6 * scale - scale for line in lines]
+    width = max(lineWidth)
+    height = len(lines) * 8 * scale - scale
+    dx, dy = _anchorOffset(options.get("anchor", "center"), width, height)
+    left, top = coords[0] + dx, coords[1] + dy
+    justify = options.get("justify", "left")
+    for number, line in enumerate(lines):
+        x = left
+        if justify == "center":
+            x = left + (width - lineWidth[number]) / 2.0
+        elif justify == "right":
+            x = left + width - lineWidth[number]
+        y = top + number * 8 * scale
+        for char in line:
+            glyph = _FONT.get(char.upper(), _FONT_MISSING)
+            for row, bits in enumerate(glyph):
+                for column in range(5):
+                    if bits & (0x10 >> column):
+                        raster.fillRect(x + column * scale, y + row * scale,
+                                        x + (column + 1) * scale,
+                                        y + (row + 1) * scale, rgb)
+            x = x + 6 * scale
+
+
+def _drawImage(raster, coords, options):
+    image = options.get("image")
+    if not image or graphics._root is None:
+        return
+    tkapp = graphics._root.tk
+    width = int(tkapp.call("image", "width", image))
+    height = int(tkapp.call("image", "height", image))
+    pixels = graphics._photoPixels(image, 0, 0, width, height)
+    dx, dy = _anchorOffset(options.get("anchor", "center"), width, height)
+    raster.blit(coords[0] + dx, coords[1] + dy, width, height, pixels)
+
+
+_DRAW_ITEM = {"line": _drawLine,
+              "rectangle": _drawRectangle,
+              "oval": _drawOval,
+              "polygon": _drawPolygon,
+              "text": _drawText,
+              "image": _drawImage}
+
+##########################################################################
+# Colors
+
+_COLOR_NAMES = {"black": "#000000", "white": "#ffffff", "red": "#ff0000",
+                "green": "#00ff00", "blue": "#0000ff", "yellow": "#ffff00",
+                "cyan": "#00ffff", "magenta": "#ff00ff", "gray": "#bebebe",
+                "grey": "#bebebe", "orange": "#ffa500", "purple": "#a020f0",
+                "brown": "#a52a2a", "pink": "#ffc0cb"}
+
+_rgbCache = {}
+
+def _rgb(color):
+    # Returns the r,g,b bytes of a Tk color string
+    rgb = _rgbCache.get(color)
+    if rgb is None:
+        name = color.lower().replace(" ", "")
+        name = _COLOR_NAMES.get(name, name)
+        if name.startswith("#") and len(name) == 7:
+            rgb = bytes(bytearray.fromhex(name[1:]))
+        elif name.startswith("#") and len(name) == 4:
+            rgb = bytes(bytearray.fromhex("".join(c * 2 for c in name[1:])))
+        elif graphics._root is not None:
+            r, g, b = graphics._root.winfo_rgb(color)
+            rgb = bytes(bytearray((r >> 8, g >> 8, b >> 8)))
+        else:
+            rgb = b"\x00\x00\x00"
+        _rgbCache[color] = rgb
+    return rgb
+
+##########################################################################
+# 5x7 bitmap font. Each glyph is 7 rows of 5 bits, top row first. Lower
+# case letters are drawn as upper case.
+
+_FONT = {
+    " ": (0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00),
+    "0": (0x0E, 0x11, 0x13, 0x15, 0x19, 0x11, 0x0E),
+    "1": (0x04, 0x0C, 0x04, 0x04, 0x04, 0x04, 0x0E),
+    "2": (0x0E, 0x11, 0x01, 0x02, 0x04, 0x08, 0x1F),
+    "3": (0x1F, 0x02, 0x04, 0x02, 0x01, 0x11, 0x0E),
+    "4": (0x02, 0x06, 0x0A, 0x12, 0x1F, 0x02, 0x02),
+    "5": (0x1F, 0x10, 0x1E, 0x01, 0x01, 0x11, 0x0E),
+    "6": (0x06, 0x08, 0x10, 0x1E, 0x11, 0x11, 0x0E),
+    "7": (0x1F, 0x01, 0x02, 0x04, 0x08, 0x08, 0x08),
+    "8": (0x0E, 0x11, 0x11, 0x0E, 0x11, 0x11, 0x0E),
+    "9": (0x0E, 0x11, 0x11, 0x0F, 0x01, 0x02, 0x0C),
+    "A": (0x0E, 0x11, 0x11, 0x11, 0x1F, 0x11, 0x11),
+    "B": (0x1E, 0x11, 0x11, 0x1E, 0x11, 0x11, 0x1E),
+    "C": (0x0E, 0x11, 0x10, 0x10, 0x10, 0x11, 0x0E),
+    "D": (0x1C, 0x12, 0x11, 0x11, 0x11, 0x12, 0x1C),
+    "E": (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x1F),
+    "F": (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x10),
+    "G": (0x0E, 0x11, 0x10, 0x17, 0x11, 0x11, 0x0F),
+    "H": (0x11, 0x11, 0x11, 0x1F, 0x11, 0x11, 0x11),
+    "I": (0x0E, 0x04, 0x04, 0x04, 0x04, 0x04, 0x0E),
+    "J": (0x07, 0x02, 0x02, 0x02, 0x02, 0x12, 0x0C),
+    "K": (0x11, 0x12, 0x14, 0x18, 0x14, 0x12, 0x11),
+    "L": (0x10, 0x10, 0x10, 0x10, 0x10, 0x10, 0x1F),
+    "M": (0x11, 0x1B, 0x15, 0x15, 0x11, 0x11, 0x11),
+    "N": (0x11, 0x11, 0x19, 0x15, 0x13, 0x11, 0x11),
+    "O": (0x0E, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E),
+    "P": (0x1E, 0x11, 0x11, 0x1E, 0x10, 0x10, 0x10),
+    "Q": (0x0E, 0x11, 0x11, 0x11, 0x15, 0x12, 0x0D),
+    "R": (0x1E, 0x11, 0x11, 0x1E, 0x14, 0x12, 0x11),
+    "S": (0x0F, 0x10, 0x10, 0x0E, 0x01, 0x01, 0x1E),
+    "T": (0x1F, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04),
+    "U": (0x11, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E),
+    "V": (0x11, 0x11, 0x11, 0x11, 0x11, 0x0A, 0x04),
+    "W": (0x11, 0x11, 0x11, 0x15, 0x15, 0x15, 0x0A),
+    "X": (0x11, 0x11, 0x0A, 0x04, 0x0A, 0x11, 0x11),
+    "Y": (0x11, 0x11, 0x11, 0x0A, 0x04, 0x04, 0x04),
+    "Z": (0x1F, 0x01, 0x02, 0x04, 0x08, 0x10, 0x1F),
+    ".": (0x00, 0x00, 0x00, 0x00, 0x00, 0x0C, 0x0C),
+    ",": (0x00, 0x00, 0x00, 0x00, 0x0C, 0x04, 0x08),
+    ":": (0x00, 0x0C, 0x0C, 0x00, 0x0C, 0x0C, 0x00),
+    "!": (0x04, 0x04, 0x04, 0x04, 0x00, 0x00, 0x04),
+    "?": (0x0E, 0x11, 0x01, 0x02, 0x04, 0x00, 0x04),
+    "-": (0x00, 0x00, 0x00, 0x1F, 0x00, 0x00, 0x00),
+    "'": (0x0C, 0x04, 0x08, 0x00, 0x00, 0x00, 0x00),
+    "/": (0x00, 0x01, 0x02, 0x04, 0x08, 0x10, 0x00),
+    "(": (0x02, 0x04, 0x08, 0x08, 0x08, 0x04, 0x02),
+    ")": (0x08, 0x04, 0x02, 0x02, 0x02, 0x04, 0x08),
+    "_": (0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x1F),
+}
+
+_FONT_MISSING = (0x1F, 0x11, 0x11, 0x11, 0x11, 0x11, 0x1F)
+
+##########################################################################
+# Image files
+
+def shrink(data, width, height, scale):
+    """Shrinks an r,g,b buffer to 1/scale of its size by keeping every
+    scale'th pixel. Returns (data, width, height) of the result."""
+    newWidth = (width + scale - 1) // scale
+    newHeight = (height + scale - 1) // scale
+    result = bytearray()
+    stride = width * 3
+    for y in range(0, height, scale):
+        row = data[y * stride:(y + 1) * stride]
+        for x in range(0, stride, 3 * scale):
+            result += row[x:x + 3]
+    return result, newWidth, newHeight
+
+
+def writePPM(filename, width, height, data):
+    """Writes an r,g,b buffer to filename as a binary PPM image"""
+    with open(filename, "wb") as file:
+        file.write(("P6 %d %d 255\n" % (width, height)).encode("ascii"))
+        file.write(bytes(data))
+
+
+def writePNG(filename, width, height, data):
+    """Writes an r,g,b buffer to filename as a PNG image"""
+    stride = width * 3
+    raw = bytearray()
+    for y in range(height):
+        raw.append(0)  # no filter
+        raw += data[y * stride:(y + 1) * stride]
+
+    def chunk(kind, body):
+        crc = zlib.crc32(kind + body) & 0xffffffff
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", crc)
+
+    with open(filename, "wb") as file:
+        file.write(b"\x89PNG\r\n\x1a\n")
+        file.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height,
+                                              8, 2, 0, 0, 0)))
+        file.write(chunk(b"IDAT", zlib.compress(bytes(raw))))
+        file.write(chunk(b"IEND", b""))
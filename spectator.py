@@ -0,0 +1,203 @@
+import york_graphics as yg
+from random import choice, randint
+from time import sleep
+
+import game
+from game import SnakeSegment
+
+"""
+Shows lots of games of snake being played at once, in a grid in one window, e.g. for an arcade wall
+or for watching an AI being trained. Run this file to watch a grid of games played by Steer().
+"""
+
+class Spectator(object):
+    """
+    Shows many games at once, each as a small picture of its board with one or a few pixels for each
+    tile. All the boards are drawn into a single image, and each tick only the tiles which have changed
+    are written into it, so the cost of a tick depends on how much has happened rather than on how many
+    games there are.
+
+    The games are played without windows of their own (see Game.Reset()). Whatever plays them must
+    leave their dirty cells alone, as Draw() takes them with Game.TakeDirtyCells().
+    """
+    IMAGE_KEY = "spectator"
+    GAP_COLOUR = yg.getRGBColour(40, 40, 40)
+
+    def __init__(self, games, columns, scale = 2, gap = 4):
+        """
+        Param games: the games to show. They must have been started with Game.Reset().
+        Param columns: the number of games on each row of the grid.
+        Param scale: the width and height of each tile in pixels.
+        Param gap: the space between the boards in pixels.
+        """
+        self.games = games
+        self.columns = columns
+        self.rows = (len(games) + columns - 1) // columns
+        self.scale = scale
+        self.gap = gap
+
+        # Every board is drawn the same size, big enough for the biggest one.
+        self.boardWidth = max(g.boardWidth for g in games) * scale
+        self.boardHeight = max(g.boardHeight for g in games) * scale
+        self.width = columns * (self.boardWidth + gap) + gap
+        self.height = self.rows * (self.boardHeight + gap) + gap
+
+    def Open(self):
+        """
+        Open the window and draw every board in it.
+        """
+        yg.openWindow(width = self.width, height = self.height, title = "Snake Spectator")
+        self.useImage = yg.canDrawImages()
+        yg.setCanvasColour(self.GAP_COLOUR)
+        if self.useImage:
+            yg.moveTo(0, 0)
+            yg.drawBlankImage(self.width, self.height, self.IMAGE_KEY)
+            yg.fillImage(self.IMAGE_KEY, 0, 0, self.width, self.height, self.GAP_COLOUR)
+        for index in range(len(self.games)):
+            self.DrawWholeBoard(index)
+
+    def BoardPosition(self, index):
+        """
+        Return the (x, y) pixel position of the top left of a game's board.
+        """
+        row, col = divmod(index, self.columns)
+        return (self.gap + col * (self.boardWidth + self.gap),
+                self.gap + row * (self.boardHeight + self.gap))
+
+    def DrawWholeBoard(self, index):
+        """
+        Draw every tile of a game's board, e.g. when it has started again.
+        """
+        g = self.games[index]
+        g.TakeDirtyCells()
+        x, y = self.BoardPosition(index)
+        width = g.boardWidth * self.scale
+        height = g.boardHeight * self.scale
+        if self.useImage:
+            yg.fillImage(self.IMAGE_KEY, x, y, width, height, g.TILE_COLOUR_EMPTY)
+        else:
+            yg.clearGroup(self.GroupName(index))
+            yg.setGroup(self.GroupName(index))
+            # A line as thick as the board is tall covers it, like Game.DrawTile() does a tile
+            yg.moveTo(x, y + height / 2)
+            yg.setLineColour(g.TILE_COLOUR_EMPTY)
+            yg.setLineThickness(height)
+            yg.drawLine(width, 0, (index, "board"))
+            yg.setGroup(None)
+
+        cells = []
+        for row in range(g.boardHeight):
+            for col in range(g.boardWidth):
+                if g.board[row][col] != g.TILE_ID_EMPTY:
+                    cells.append((row, col))
+        self.DrawCells(index, cells)
+
+    def DrawCells(self, index, cells):
+        """
+        Draw the given (row, column) cells of a game's board.
+        """
+        g = self.games[index]
+        left, top = self.BoardPosition(index)
+        scale = self.scale
+        yg.setGroup(self.GroupName(index))
+        for row, col in cells:
+            colour = g.TILE_COLOURS[g.board[row][col]]
+            x = left + col * scale
+            y = top + row * scale
+            if self.useImage:
+                yg.fillImage(self.IMAGE_KEY, x, y, scale, scale, colour)
+            elif g.board[row][col] == g.TILE_ID_EMPTY:
+                yg.removeShape((index, row, col))
+            else:
+                g.DrawTile(x, y, scale, colour, (index, row, col))
+        yg.setGroup(None)
+
+    def GroupName(self, index):
+        return "game%d" % index
+
+    def Draw(self):
+        """
+        Draw the tiles of every board which have changed since the last call. Games where nothing
+        has changed are not touched at all.
+        """
+        yg.beginFrame()
+        for index in range(len(self.games)):
+            cells = self.games[index].TakeDirtyCells()
+            if len(cells) > 0:
+                self.DrawCells(index, cells)
+        yg.endFrame()
+
+    def Update(self):
+        """
+        Play one move of every game, steered by Steer(). A game which has been lost starts again.
+        """
+        for index in range(len(self.games)):
+            g = self.games[index]
+            Steer(g)
+            g.Update()
+            if g.activeMenu != None:
+                g.activeMenu = None
+                g.Reset()
+                self.DrawWholeBoard(index)
+
+    def Main(self):
+        """
+        Open the window and play the games until it is closed.
+        """
+        self.Open()
+        while not yg.isWindowClosed():
+            self.Update()
+            self.Draw()
+            sleep(game.Game.TICK_TIME)
+
+
+
+# The (column, row) step of each direction the snake can move in
+STEPS = {SnakeSegment.MOVING_LEFT:  (-1, 0),
+         SnakeSegment.MOVING_RIGHT: (1, 0),
+         SnakeSegment.MOVING_UP:    (0, -1),
+         SnakeSegment.MOVING_DOWN:  (0, 1)}
+
+def Steer(g):
+    """
+    Turn the snake of a game without a player. It heads for the food, unless that would take it off
+    the board or into itself, and otherwise keeps going with the odd random turn.
+    """
+    head = g.snake[0]
+    food = FindFood(g)
+    best = []
+    safe = []
+    for direction, (dx, dy) in STEPS.items():
+        tile = g.GetNextTile(0, direction)[0]
+        if tile == g.TILE_ID_FOOD:
+            head.direction = direction
+            return
+        if tile == g.TILE_ID_EMPTY:
+            safe.append(direction)
+            if food != None and abs(food[1] - head.x - dx) + abs(food[0] - head.y - dy) < abs(food[1] - head.x) + abs(food[0] - head.y):
+                best.append(direction)
+
+    if head.direction in best:
+        return
+    if len(best) > 0:
+        head.direction = choice(best)
+    elif len(safe) > 0 and (head.direction not in safe or randint(0, 7) == 0):
+        head.direction = choice(safe)
+
+def FindFood(g):
+    """
+    Return the (row, column) of a food tile on a game's board, or None if there isn't one.
+    """
+    for row in range(g.boardHeight):
+        if g.TILE_ID_FOOD in g.board[row]:
+            return (row, g.board[row].index(g.TILE_ID_FOOD))
+    return None
+
+
+if __name__ == "__main__":
+    games = []
+    for i in range(64):
+        g = game.Game()
+        g.Reset()
+        games.append(g)
+    Spectator(games, 8).Main()
@@ -0,0 +1,267 @@
+# terminal.py
+"""Windows which draw in a text terminal
+
+TerminalWin is a GraphWin which draws with characters in a terminal,
+using the curses module, instead of opening a window. It needs neither
+Tk nor a display, so games can be played over a slow SSH connection.
+The window is split into cells, each cellWidth x cellHeight pixels,
+and each cell is shown as one character coloured like the middle of
+the cell. Text is written out as characters.
+
+Each time the window is updated the cells are worked out again, but
+only the ones which are different to what is already on the terminal
+are written, so a frame in which little has changed sends very little.
+
+--------------------------------------------------------------------
+import york_graphics as yg
+
+yg.setBackend("terminal")
+yg.openWindow(640, 480)
+--------------------------------------------------------------------
+
+Keys pressed in the terminal are returned by checkKey with the same
+names Tk gives them, e.g. "Left", "Return" or "a". There is no mouse,
+and images can't be drawn."""
+
+import atexit, curses, math
+
+import offscreen
+
+# Tk names of the special keys curses can return
+_KEY_NAMES = {curses.KEY_LEFT: "Left", curses.KEY_RIGHT: "Right",
+              curses.KEY_UP: "Up", curses.KEY_DOWN: "Down",
+              curses.KEY_ENTER: "Return", 10: "Return", 13: "Return",
+              curses.KEY_BACKSPACE: "BackSpace", 8: "BackSpace",
+              127: "BackSpace", curses.KEY_DC: "Delete", 27: "Escape",
+              9: "Tab", 32: "space", curses.KEY_HOME: "Home",
+              curses.KEY_END: "End"}
+
+# Levels of red, green and blue in the 6x6x6 color cube of 256 color
+# terminals, which starts at color 16
+_CUBE_LEVELS = (0, 95, 135, 175, 215, 255)
+
+class TerminalWin(offscreen.OffscreenWin):
+
+    """A TerminalWin is a GraphWin which draws with characters in a
+    terminal rather than in a window on the screen."""
+
+    def __init__(self, title="Graphics Window", width=200, height=200,
+                 autoflush=True, cellWidth=16, cellHeight=32):
+        offscreen.OffscreenWin.__init__(self, title, width, height,
+                                        autoflush)
+        self.cellWidth = cellWidth
+        self.cellHeight = cellHeight
+        self.columns = -(-self.width // cellWidth)
+        self.rows = -(-self.height // cellHeight)
+        self.shown = [None] * (self.columns * self.rows)  # cells on the terminal
+        self.pairs = {}  # (foreground, background) color numbers -> curses pair
+
+        self.screen = curses.initscr()
+        atexit.register(self.close)
+        curses.noecho()
+        curses.cbreak()
+        self.screen.keypad(True)
+        self.screen.nodelay(True)
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass  # the terminal can't hide its cursor
+        if curses.has_colors():
+            curses.start_color()
+
+    def __repr__(self):
+        if self.isClosed():
+            return "<Closed TerminalWin>"
+        else:
+            return "TerminalWin('{}', {}, {})".format(self.title,
+                                                     self.getWidth(),
+                                                     self.getHeight())
+
+    def close(self):
+        """Close the window, giving the terminal back"""
+        if self.closed:
+            return
+        self.closed = True
+        curses.endwin()
+
+    def canDrawImages(self):
+        return False
+
+    def _flush(self):
+        self.flushCount = self.flushCount + 1
+        if self.closed:
+            return
+        cells = self.getCells()
+        shown = self.shown
+        maxRow, maxColumn = self.screen.getmaxyx()
+        for i in range(len(cells)):
+            if cells[i] != shown[i]:
+                shown[i] = cells[i]
+                row, column = divmod(i, self.columns)
+                if row < maxRow and column < maxColumn:
+                    self._writeCell(row, column, cells[i])
+        self.screen.noutrefresh()
+        curses.doupdate()
+
+    def _writeCell(self, row, column, cell):
+        char, foreground, background = cell
+        attr = curses.color_pair(self._pair(foreground, background))
+        try:
+            self.screen.addstr(row, column, char, attr)
+        except curses.error:
+            pass  # writing the bottom right cell moves the cursor off the end
+
+    def _pair(self, foreground, background):
+        # Returns the curses color pair of two r,g,b colors, making it the
+        # first time it is needed. Pair 0 is the terminal's own colors.
+        if not curses.has_colors():
+            return 0
+        key = (_colorNumber(foreground), _colorNumber(background))
+        pair = self.pairs.get(key)
+        if pair is None:
+            pair = len(self.pairs) + 1
+            if pair >= curses.COLOR_PAIRS:
+                return 0
+            curses.init_pair(pair, key[0], key[1])
+            self.pairs[key] = pair
+        return pair
+
+    def update(self):
+        # Like Tk, only the last key pressed since the window was last
+        # checked is kept
+        if self.closed:
+            return
+        while True:
+            try:
+                key = self.screen.get_wch()
+            except curses.error:
+                break  # no more keys waiting
+            name = _keyName(key)
+            if name:
+                self.lastKey = name
+
+    def getCells(self):
+        """Returns a list of (character, foreground, background) for each
+        cell, row by row, the colors being r,g,b bytes"""
+        cells = _CellRaster(self.columns, self.rows, self.cellWidth,
+                            self.cellHeight, self.background)
+        for item in self._stacked().values():
+            options = item.options
+            if options.get("state") == "hidden":
+                continue
+            if item.type == "text":
+                cells.writeText(item.coords, options)
+            else:
+                draw = offscreen._DRAW_ITEM.get(item.type)
+                if draw:
+                    draw(cells, item.coords, options)
+        return cells.getCells()
+
+
+class _CellRaster:
+
+    """Internal grid of cells which the offscreen drawing functions can
+    draw into in place of a pixel raster. A cell takes the color of
+    anything drawn over its middle."""
+
+    def __init__(self, columns, rows, cellWidth, cellHeight, background):
+        self.columns = columns
+        self.rows = rows
+        self.cellWidth = cellWidth
+        self.cellHeight = cellHeight
+        self.width = columns * cellWidth
+        self.height = rows * cellHeight
+        self.colors = [offscreen._rgb(background)] * (columns * rows)
+        self.chars = [None] * (columns * rows)  # (character, color) of text
+
+    def fillRect(self, x1, y1, x2, y2, rgb):
+        # Colors the cells whose middles are from (x1,y1) up to but not
+        # including (x2,y2), covering any text in them
+        column1 = max(0, _firstMiddle(x1, self.cellWidth))
+        column2 = min(self.columns, _firstMiddle(x2, self.cellWidth))
+        row1 = max(0, _firstMiddle(y1, self.cellHeight))
+        row2 = min(self.rows, _firstMiddle(y2, self.cellHeight))
+        if column1 >= column2 or row1 >= row2:
+            return
+        colors = [rgb] * (column2 - column1)
+        blank = [None] * (column2 - column1)
+        for row in range(row1, row2):
+            start = row * self.columns
+            self.colors[start + column1:start + column2] = colors
+            self.chars[start + column1:start + column2] = blank
+
+    def blit(self, x, y, width, height, pixels):
+        pass  # images are not drawn
+
+    def writeText(self, coords, options):
+        text = str(options.get("text", "")).replace("\t", "    ")
+        color = options.get("fill", "black")
+        if not text or not color:
+            return
+        rgb = offscreen._rgb(color)
+        lines = text.split("\n")
+        width = max(len(line) for line in lines)
+        dx, dy = offscreen._anchorOffset(options.get("anchor", "center"),
+                                         width, len(lines))
+        left = offscreen._px(coords[0] / float(self.cellWidth) + dx)
+        top = offscreen._px(coords[1] / float(self.cellHeight) + dy)
+        justify = options.get("justify", "left")
+        for number, line in enumerate(lines):
+            row = top + number
+            if not 0 <= row < self.rows:
+                continue
+            column = left
+            if justify == "center":
+                column = left + (width - len(line)) // 2
+            elif justify == "right":
+                column = left + width - len(line)
+            for char in line:
+                if 0 <= column < self.columns:
+                    self.chars[row * self.columns + column] = (char, rgb)
+                column = column + 1
+
+    def getCells(self):
+        cells = []
+        for color, char in zip(self.colors, self.chars):
+            if char is None:
+                cells.append((" ", color, color))
+            else:
+                cells.append((char[0], char[1], color))
+        return cells
+
+
+def _firstMiddle(x, size):
+    # Returns the first cell whose middle is at or after x
+    return int(math.ceil(x / float(size) - 0.5))
+
+def _keyName(key):
+    # Returns the Tk name of a key read with get_wch, or None if there is
+    # no name for it
+    if isinstance(key, str):
+        code = ord(key)
+        if code in _KEY_NAMES:
+            return _KEY_NAMES[code]
+        if key.isprintable():
+            return key
+        return None
+    return _KEY_NAMES.get(key)
+
+_colorNumbers = {}
+
+def _colorNumber(rgb):
+    # Returns the nearest color the terminal can show to r,g,b bytes
+    number = _colorNumbers.get(rgb)
+    if number is None:
+        number = _colorNumbers[rgb] = _nearestColor(rgb)
+    return number
+
+def _nearestColor(rgb):
+    if curses.COLORS >= 256:
+        levels = []
+        for value in bytearray(rgb):
+            levels.append(min(range(6), key=lambda i: abs(_CUBE_LEVELS[i] - value)))
+        return 16 + 36 * levels[0] + 6 * levels[1] + levels[2]
+    # Only the 8 basic colors, which are numbered by their blue, green
+    # and red bits
+    r, g, b = [value > 127 for value in bytearray(rgb)]
+    return r * curses.COLOR_RED + g * curses.COLOR_GREEN + b * curses.COLOR_BLUE
@@ -14,6 +14,9 @@
 #
 ###############################################################################
 
+import os
+from collections import OrderedDict
+
 import graphics
 
 # Unfortunately, globals are a requirement for removing the Object orientation
@@ -25,12 +28,51 @@ global _current_line_thickness
 global _current_line_colour
 global _current_fill_colour
 global _clear_canvas
+global _shapes
+global _canvas_colour
+global _backend
+global _group
+global _retained_top
+global _layers
+global _image_cache_size
 _objects = []
 _current_line_thickness = 1
 _current_line_colour = "black"
 _current_fill_colour = "black"
 _text_properties = {"size": 10, "face": "helvetica", "style": "normal", "align": "left", "anchor": "center"}
 _clear_canvas = False
+_shapes = {}  # retained shapes, by the key they were drawn with
+_canvas_colour = None
+_backend = ("tk", {})  # see setBackend()
+_group = None  # group new shapes are put in, see setGroup()
+_IMMEDIATE_TAG = "york_immediate"  # canvas tag of every shape drawn without a key
+_text_cache = {}  # text drawn without a key in the last frame, see drawText()
+_reused = set()  # text from the last frame which is being drawn again
+_retained_top = {}  # layer -> stackOrder of the last retained shape drawn in it
+_layers = {}  # layer name -> hidden marker at the top of the layer, see setLayers()
+_LAYER_TAG = "york_layer"  # canvas tag of the layer markers
+_image_cache = OrderedDict()  # filename -> (modified time, decoded image), least recently used first
+_image_cache_size = 32  # see setImageCacheSize()
+_atlases = {}  # atlas name -> graphics.Atlas, see loadAtlas()
+
+
+def setBackend(name, **options):
+    """Chooses what the window opened by openWindow() draws onto. Must be
+    called before openWindow().
+    @param name "tk" (the default) to draw in a normal window on the
+    screen, "offscreen" to draw into memory without needing a display,
+    "terminal" to draw with characters in the terminal (see terminal.py), or
+    "null" to draw nothing at all, e.g. to time a program without its drawing.
+    See saveFrame() for getting an offscreen frame out.
+    @param options Extra options for the window. For "offscreen" and "null",
+    keys can be a list of key presses for getKeyPress() to return one at a
+    time, "" meaning no key was pressed. A "null" window closes itself once
+    every key has been returned, see isWindowClosed().
+    """
+    global _backend
+    if name not in ("tk", "offscreen", "terminal", "null"):
+        raise graphics.GraphicsError("Unknown backend " + str(name))
+    _backend = (name, options)
 
 
 def openWindow(width=800, height=600, title="Graphics Window"):
@@ -43,12 +85,41 @@ def openWindow(width=800, height=600, title="Graphics Window"):
     """
     global _window
     global _current_point
+    global _retained_top
+    global _layers
+    global _objects
+    global _clear_canvas
+    global _shapes
+    global _canvas_colour
+    global _text_cache
+    global _reused
 
     # Open the window
-    _window = graphics.GraphWin(title, width, height)
+    name, options = _backend
+    if name == "offscreen":
+        import offscreen
+        _window = offscreen.OffscreenWin(title, width, height, **options)
+    elif name == "null":
+        import offscreen
+        _window = offscreen.NullWin(title, width, height, **options)
+    elif name == "terminal":
+        import terminal
+        _window = terminal.TerminalWin(title, width, height, **options)
+    else:
+        _window = graphics.GraphWin(title, width, height, **options)
 
     # Set a current point to start drawing from as (0, 0)
-    _current_point = graphics.Point(0, 0)
+    _current_point = graphics.Coord(0, 0)
+
+    # Nothing drawn in an earlier window is on the new one
+    _retained_top = {}
+    _layers = {}
+    _objects = []
+    _clear_canvas = False
+    _shapes = {}
+    _canvas_colour = None
+    _text_cache = {}
+    _reused = set()
 
 
 def closeWindow():
@@ -57,30 +128,125 @@ def closeWindow():
     _window.close()
 
 
+def isWindowClosed():
+    """Returns True if the window has been closed, by closeWindow() or e.g. by
+    the user clicking its close button. Nothing can be drawn once it is.
+    """
+    return _window.isClosed()
+
+
+def setWindowPosition(x, y):
+    """Moves the window so its top left corner is at (x, y) on the screen.
+    Does nothing for an offscreen window.
+    @param x X coordinate of the window in pixels from the left of the screen
+    @param y Y coordinate of the window in pixels from the top of the screen
+    """
+    _window.setPosition(x, y)
+
+
+def canDrawImages():
+    """Returns True if images (drawImage(), drawBlankImage()) can be drawn in
+    the window.
+
+    @return True if images can be drawn
+    """
+    return _window.canDrawImages()
+
+
+def saveFrame(filename, scale=1):
+    """Saves what has been drawn on an offscreen window (see setBackend()) as
+    a PNG or PPM image, depending on the filename extension.
+    @param filename Filename of the image, ending in .png or .ppm
+    @param scale If more than 1, the image is shrunk to 1/scale of the size of
+    the window, e.g. for thumbnails
+    """
+    if not hasattr(_window, "save"):
+        raise graphics.GraphicsError("saveFrame needs an offscreen window")
+    _window.save(filename, scale)
+
+
+def grabFrame(scale=1):
+    """Returns what is currently drawn on the window as a tuple
+    (width, height, data), data holding the red, green and blue bytes of each
+    pixel row by row. This works with both tk and offscreen windows, but is
+    much slower on tk as every item has to be read back from the canvas.
+    @param scale If more than 1, the frame is shrunk to 1/scale of the size of
+    the window
+    """
+    import offscreen
+    if hasattr(_window, "getPixels"):
+        data = _window.getPixels()
+    else:
+        data = offscreen.rasterise(_window.getWidth(), _window.getHeight(),
+                                   _window.cget("bg"), offscreen.snapshot(_window))
+    width, height = _window.getWidth(), _window.getHeight()
+    if scale > 1:
+        data, width, height = offscreen.shrink(data, width, height, scale)
+    return (width, height, data)
+
+
 def updateCanvas():
     """Updates the canvas. I.E. draws all the objects onto the canvas
     that have been added since the last update or clear. 
     """
     global _clear_canvas
     if _clear_canvas:
-        for i in _window.items[:]:
-            i.undraw()
-        del _window.items[:]
-        _window.items = []
+        # Only objects drawn without a key are cleared, retained shapes stay
+        # on the canvas until they are removed with removeShape(). Text which
+        # has been drawn again the same (see drawText()) is kept.
+        if _reused:
+            _window.undrawItems([i for i in _objects[:_clear_canvas] if i not in _reused])
+        else:
+            _window.deleteTag(_IMMEDIATE_TAG)
         del _objects[:_clear_canvas]
     _clear_canvas = False
 
-    # Draw all objects that belong on the canvas in the order they were added
+    # Draw all objects that belong on the canvas in the order they were added.
+    # Kept text is only raised if something it should be on top of has been
+    # drawn in its layer since.
+    top = dict(_retained_top)
     for i in _objects:
-        try:
+        layer = _layerOf(i)
+        if i.canvas == None:
             i.draw(_window)
-        except graphics.GraphicsError as e:
-            # Catch error where object is already drawn - this is okay.
-            pass
+            _place(i, layer)
+        elif i in _reused and i.stackOrder < top.get(layer, 0):
+            _place(i, layer, True)
+        top[layer] = max(top.get(layer, 0), i.stackOrder)
+    _reused.clear()
+
+    for cache_key, shape in list(_text_cache.items()):
+        if shape.canvas == None:
+            del _text_cache[cache_key]
+
+
+def beginFrame():
+    """Starts drawing a frame. Nothing drawn is shown until endFrame() is
+    called, which updates the window once for the whole frame instead of
+    once for every shape.
+    """
+    _window.beginFrame()
+
+
+def endFrame():
+    """Finishes the frame started by beginFrame() and shows it.
+    """
+    _window.endFrame()
+
+
+def getFrameFlushCount():
+    """Returns how many times the window was updated during the last frame.
+    This should be 1 if the frame was drawn between beginFrame() and
+    endFrame().
+
+    @return number of window updates
+    """
+    return _window.frameFlushes
 
 
 def clearCanvas():
-    """Clears the canvas to background colour.
+    """Clears the canvas to background colour. Shapes drawn with a key are
+    not cleared, see removeShape() and clearShapes().
     """
     global _clear_canvas
     global _objects
@@ -90,7 +256,12 @@ def clearCanvas():
 def setCanvasColour(colour):
     """Sets the background colour of the canvas to the specified colour
     """
-    _window.setBackground(colour)
+    global _canvas_colour
+    # Setting the background forces a window update, so only do it when the
+    # colour actually changes.
+    if colour != _canvas_colour:
+        _window.setBackground(colour)
+        _canvas_colour = colour
 
 
 def moveTo(x, y):
@@ -102,36 +273,236 @@ def moveTo(x, y):
     _current_point.y = y
 
 
-def drawLine(x, y):
+def drawLine(x, y, key=None):
     """Draws a line from the current graphics pen point given
     by vector (x, y). Moves the graphics pen point
     @param x Length of line in X direction
     @param y Length of line in Y direction
+    @param key If given, the line is a retained shape. It is drawn straight
+    away and stays on the canvas until removeShape(key) is called. Drawing
+    again with the same key only changes what is different about the line.
     """
-    # For some silly reason, the line takes its fill colour
-    shape = graphics.Line(_current_point,
-                          graphics.Point(_current_point.x + x, _current_point.y + y))
-    shape.setFill(_current_line_colour)
-    shape.setWidth(_current_line_thickness)
-    _objects.append(shape)
-    moveTo(_current_point.x + x, _current_point.y + y)
+    x = _current_point.x + x
+    y = _current_point.y + y
+    if key is None:
+        # For some silly reason, the line takes its fill colour
+        shape = graphics.Line(_current_point, graphics.Coord(x, y))
+        shape.setFill(_current_line_colour)
+        shape.setWidth(_current_line_thickness)
+        _addObject(shape)
+    else:
+        shape = _shapes.get(key)
+        if not isinstance(shape, graphics.Line) or shape.canvas == None:
+            shape = graphics.Line(_current_point, graphics.Coord(x, y))
+            shape.setFill(_current_line_colour)
+            shape.setWidth(_current_line_thickness)
+            _addShape(key, shape)
+        else:
+            _updateGroup(shape)
+            p1 = shape.p1
+            p2 = shape.p2
+            if (p1.x != _current_point.x or p1.y != _current_point.y
+                    or p2.x != x or p2.y != y):
+                shape.setPoints(_current_point, graphics.Coord(x, y))
+            if shape.config["fill"] != _current_line_colour:
+                shape.setFill(_current_line_colour)
+            if shape.config["width"] != _current_line_thickness:
+                shape.setWidth(_current_line_thickness)
+    moveTo(x, y)
+
+
+def drawPolyline(points, key=None):
+    """Draws a line through a list of points as a single shape, using the
+    current line colour and thickness. The corners and ends of the line are
+    square, so a thick line through the middles of a row of squares covers
+    them exactly apart from half a square at each end. Moves the graphics pen
+    point to the last point.
+    @param points List of (x, y) coordinates, at least two
+    @param key If given, the line is a retained shape, see drawLine(). Drawing
+    again with the same key moves the points of the current line rather than
+    making a new one.
+    """
+    shape = None
+    if key is not None:
+        shape = _shapes.get(key)
+    if not isinstance(shape, graphics.Polyline) or shape.canvas == None:
+        shape = graphics.Polyline([graphics.Coord(x, y) for x, y in points])
+        shape.setFill(_current_line_colour)
+        shape.setWidth(_current_line_thickness)
+        shape.setJoinStyle("miter")
+        if key is None:
+            _addObject(shape)
+        else:
+            _addShape(key, shape)
+    else:
+        _updateGroup(shape)
+        old = shape.points
+        if (len(old) != len(points) or
+                any(p.x != x or p.y != y for p, (x, y) in zip(old, points))):
+            shape.setPoints([graphics.Coord(x, y) for x, y in points])
+        _setShapeOption(shape, "fill", _current_line_colour)
+        _setShapeOption(shape, "width", _current_line_thickness)
+    x, y = points[-1]
+    moveTo(x, y)
 
 
 def drawImage(filename):
     """Draws an image given by filename (should be in the same folder as your
     python script). The top left of the image is the current graphics pen point.
+    The file is only read again if it changes, see setImageCacheSize().
     @param filename Filename of image to display. Must be a gif.
     """
-    im = graphics.Image(_current_point, [filename])
+    im = graphics.Image(_current_point, _loadImage(filename))
     im.config["anchor"] = "nw"
-    _objects.append(im)
+    _addObject(im)
+
 
+def _loadImage(filename):
+    """Returns the decoded image in a file, only reading the file if it has
+    not been loaded recently or has changed since.
+    """
+    modified = os.stat(filename).st_mtime_ns
+    cached = _image_cache.pop(filename, None)
+    if cached != None and cached[0] == modified:
+        image = cached[1]
+    else:
+        image = graphics.Image(graphics.Coord(0, 0), filename).img
+    _image_cache[filename] = (modified, image)
+    while len(_image_cache) > _image_cache_size:
+        _image_cache.popitem(last=False)
+    return image
+
+
+def setImageCacheSize(size):
+    """Sets how many image files drawImage() keeps decoded, so they do not
+    have to be read again every time they are drawn. When there are more,
+    the one drawn longest ago is dropped. The default is 32.
+    @param size Number of images to keep, 0 to read the file every time
+    """
+    global _image_cache_size
+    _image_cache_size = size
+    while len(_image_cache) > size:
+        _image_cache.popitem(last=False)
+
+
+def drawBlankImage(width, height, key):
+    """Draws a blank image with its top left at the current graphics pen
+    point. The image is a retained shape (see drawLine()), and its pixels can
+    be coloured with fillImage(). Drawing again with the same key and size
+    keeps the current image and its pixels.
+    @param width Width of the image in pixels
+    @param height Height of the image in pixels
+    @param key Key of the image
+    """
+    shape = _shapes.get(key)
+    if (not isinstance(shape, graphics.Image) or shape.canvas == None
+            or shape.getWidth() != width or shape.getHeight() != height):
+        shape = graphics.Image(_current_point, width, height)
+        shape.config["anchor"] = "nw"
+        _addShape(key, shape)
+        return
+
+    _updateGroup(shape)
+    anchor = shape.anchor
+    if anchor.x != _current_point.x or anchor.y != _current_point.y:
+        shape.move(_current_point.x - anchor.x, _current_point.y - anchor.y)
+
+
+def fillImage(key, x, y, width, height, colour):
+    """Fills a rectangle of an image drawn with drawBlankImage() with a colour.
+    The whole rectangle is changed in one go, so it is much faster than
+    colouring it one pixel at a time.
+    @param key Key the image was drawn with
+    @param x X coordinate of the left of the rectangle, in pixels from the
+    left of the image
+    @param y Y coordinate of the top of the rectangle, in pixels from the top
+    of the image
+    @param width Width of the rectangle in pixels
+    @param height Height of the rectangle in pixels
+    @param colour Colour to fill with, see note in file
+    """
+    _shapes[key].fillRect(x, y, width, height, colour)
+
+
+def loadAtlas(name, filename, regions):
+    """Loads an atlas, which is one image file holding many smaller images
+    (e.g. every sprite of a game), each a named rectangle of it. The file is
+    read once, and its images can then be copied into images drawn with
+    drawBlankImage() by blitImage() as many times as needed.
+    @param name Name to use the atlas by
+    @param filename Filename of the atlas image. Must be a gif.
+    @param regions Dictionary mapping each image's name to the
+    (x, y, width, height) of its rectangle in the file, in pixels
+    """
+    _atlases[name] = graphics.Atlas(_loadImage(filename), regions)
+
+
+def blitImage(key, atlas, region, x, y):
+    """Copies one image of an atlas into an image drawn with drawBlankImage().
+    Transparent pixels of the atlas image leave what was there before.
+    @param key Key the image to copy into was drawn with
+    @param atlas Name of the atlas, see loadAtlas()
+    @param region Name of the image in the atlas
+    @param x X coordinate to put the left of it at, in pixels from the left of
+    the image
+    @param y Y coordinate to put the top of it at, in pixels from the top of
+    the image
+    """
+    _shapes[key].blit(_atlases[atlas], region, x, y)
 
-def drawText(text):
+
+def drawText(text, key=None):
     """Draws text anchored at graphics pen point. The colour is given by the
     current line colour, and the properties of the text can be changed by
     setTextProperties().
     @param text String to write to screen
+    @param key If given, the text is a retained shape, see drawLine()
+    """
+    if key is None:
+        # Text drawn every frame, like a label, usually has not changed since
+        # the last frame. If the canvas has been cleared since, the text
+        # already on it is kept instead of making it again.
+        cache_key = (text, _textFont(), _current_line_colour,
+                     _text_properties["align"], _text_properties["anchor"],
+                     _current_point.x, _current_point.y, _group)
+        shape = _text_cache.get(cache_key)
+        if (_clear_canvas and shape != None and shape.canvas != None
+                and shape not in _reused):
+            _reused.add(shape)
+            _objects.append(shape)
+        else:
+            shape = _makeText(text)
+            _text_cache[cache_key] = shape
+            _addObject(shape)
+        return
+
+    shape = _shapes.get(key)
+    if not isinstance(shape, graphics.Text) or shape.canvas == None:
+        _addShape(key, _makeText(text))
+        return
+
+    _updateGroup(shape)
+    anchor = shape.anchor
+    if anchor.x != _current_point.x or anchor.y != _current_point.y:
+        shape.move(_current_point.x - anchor.x, _current_point.y - anchor.y)
+    if shape.getText() != text:
+        shape.setText(text)
+    _setShapeOption(shape, "font", _textFont())
+    _setShapeOption(shape, "fill", _current_line_colour)
+    _setShapeOption(shape, "justify", _text_properties["align"])
+    _setShapeOption(shape, "anchor", _text_properties["anchor"])
+
+
+def _textFont():
+    """Returns the font of new text, as the graphics module stores it.
+    """
+    return (_text_properties["face"], _text_properties["size"],
+            _text_properties["style"])
+
+
+def _makeText(text):
+    """Makes a text object using the current pen point, colour and text
+    properties.
     """
     text = graphics.Text(_current_point, text)
     text.setFace(_text_properties["face"])
@@ -141,7 +512,199 @@ def drawText(text):
     # Hack into the graphics library to set both justification and anchor point
     text.config["justify"] = _text_properties["align"]
     text.config["anchor"] = _text_properties["anchor"]
-    _objects.append(text)
+    return text
+
+
+def _setShapeOption(shape, option, value):
+    """Changes one option of a retained shape, only touching the canvas if the
+    value is different to the one it already has.
+    """
+    if shape.config.get(option) != value:
+        shape.config[option] = value
+        _window.itemconfig(shape.id, {option: value})
+
+
+def _groupTags(immediate):
+    """Returns the canvas tags for a new shape in the current group.
+    """
+    tags = ()
+    if immediate:
+        tags = (_IMMEDIATE_TAG,)
+    if _group is not None:
+        tags = tags + (_group,)
+    return tags
+
+
+def _addObject(shape):
+    """Adds a shape drawn without a key, to be drawn by the next
+    updateCanvas().
+    """
+    shape.setTags(*_groupTags(True))
+    _objects.append(shape)
+
+
+def _addShape(key, shape):
+    """Draws a new retained shape straight away, replacing any shape which
+    already has the key.
+    """
+    removeShape(key)
+    shape.setTags(*_groupTags(False))
+    shape.draw(_window)
+    _shapes[key] = shape
+    layer = _layerOf(shape)
+    _place(shape, layer)
+    _retained_top[layer] = shape.stackOrder
+
+
+def _updateGroup(shape):
+    """Moves a retained shape which is drawn again into the current group.
+    """
+    tags = _groupTags(False)
+    if shape.getTags() != tags:
+        shape.setTags(*tags)
+        _place(shape, _layerOf(shape), True)
+
+
+def moveShape(key, x, y):
+    """Moves a shape drawn with a key by the vector (x, y). The shape stays
+    the same canvas item, nothing is drawn again.
+    @param key Key the shape was drawn with
+    @param x Distance to move in X direction
+    @param y Distance to move in Y direction
+    """
+    _shapes[key].move(x, y)
+
+
+def rekeyShape(key, newKey):
+    """Gives a shape drawn with a key a new key, without changing it on the
+    canvas. Any shape which already had the new key is removed. Together with
+    moveShape() this lets a shape be reused for something else instead of
+    removing it and drawing a new one.
+    @param key Key the shape was drawn with
+    @param newKey Key to use for it from now on
+    """
+    shape = _shapes.pop(key)
+    removeShape(newKey)
+    _shapes[newKey] = shape
+
+
+def removeShape(key):
+    """Removes a shape drawn with a key from the canvas. Does nothing if there
+    is no shape with that key.
+    @param key Key the shape was drawn with
+    """
+    shape = _shapes.pop(key, None)
+    if shape != None:
+        shape.undraw()
+
+
+def clearShapes():
+    """Removes every shape drawn with a key from the canvas.
+    """
+    _window.undrawItems(_shapes.values())
+    _shapes.clear()
+
+
+def _layerOf(shape):
+    """Returns the layer a shape is in, or None if it is not in one.
+    """
+    for tag in shape.getTags():
+        if tag in _layers:
+            return tag
+    return None
+
+
+def _place(shape, layer, restack=False):
+    """Puts a shape on top of the other shapes in its layer. A shape which
+    has just been drawn is already on top of everything, so a shape not in a
+    layer is only raised if restack is True.
+    """
+    if layer is not None:
+        _window.lowerItem(shape, _layers[layer])
+    elif restack:
+        _window.raiseItem(shape)
+
+
+def setLayers(names):
+    """Makes groups (see setGroup()) into layers, which are always stacked in
+    the same order. A shape drawn in a layer goes on top of the shapes already
+    in it but stays under every layer above it, so a layer can be hidden,
+    shown or drawn into without redrawing the layers on top. Shapes in no
+    layer go on top of all of them. Must be called after openWindow().
+    @param names List of group names, from the bottom layer to the top
+    """
+    global _layers
+    _window.deleteTag(_LAYER_TAG)
+    _layers = {}
+    for name in names:
+        # Never shown, it only marks where the top of the layer is
+        marker = graphics.Line(graphics.Coord(0, 0), graphics.Coord(0, 0))
+        marker.config["state"] = "hidden"
+        marker.setTags(_LAYER_TAG)
+        marker.draw(_window)
+        _layers[name] = marker
+
+
+def setGroup(name):
+    """Puts every shape drawn from now on, with or without a key, in a group.
+    The shapes in a group can all be removed, hidden, moved or recoloured at
+    once, which takes a single canvas operation however many there are.
+    @param name Name of the group, or None for no group
+    @return the name of the group shapes were being put in before
+    """
+    global _group
+    previous = _group
+    _group = name
+    return previous
+
+
+def clearGroup(name):
+    """Removes every shape in a group from the canvas, including shapes drawn
+    with a key and shapes waiting for updateCanvas().
+    @param name Name of the group
+    """
+    global _clear_canvas
+    _window.deleteTag(name)
+    for key, shape in list(_shapes.items()):
+        if shape.canvas == None:
+            del _shapes[key]
+    # Shapes drawn without a key which have not been drawn yet
+    cleared = [i for i in _objects[:_clear_canvas] if name not in i.getTags()]
+    waiting = [i for i in _objects[_clear_canvas:] if name not in i.getTags()]
+    _objects[:] = cleared + waiting
+    _clear_canvas = len(cleared)
+
+
+def hideGroup(name):
+    """Hides every shape in a group without removing them.
+    @param name Name of the group
+    """
+    _window.hideTag(name)
+
+
+def showGroup(name):
+    """Shows the shapes in a group again after hideGroup().
+    @param name Name of the group
+    """
+    _window.showTag(name)
+
+
+def moveGroup(name, x, y):
+    """Moves every shape in a group by the vector (x, y).
+    @param name Name of the group
+    @param x Distance to move in X direction
+    @param y Distance to move in Y direction
+    """
+    _window.moveTag(name, x, y)
+
+
+def setGroupColour(name, colour):
+    """Changes the colour of every shape in a group. The group can only hold
+    lines and text, as images have no colour.
+    @param name Name of the group
+    @param colour New colour, see note in file
+    """
+    _window.configTag(name, fill=colour)
 
 
 def setTextProperties(face=None, size=None, style=None, align=None, anchor=None):